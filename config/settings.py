@@ -9,8 +9,12 @@ DEFAULT_START_DATE = os.getenv("DEFAULT_START_DATE", "2020-01-01")
 DEFAULT_END_DATE = os.getenv("DEFAULT_END_DATE", "2025-01-01")
 INITIAL_CAPITAL = float(os.getenv("INITIAL_CAPITAL", "1000000.0"))
 DB_PATH = os.getenv("DB_PATH", "data/market_data.db")
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "parquet")
+CACHE_DIR = os.getenv("CACHE_DIR", "data/cache")
 DATA_PROVIDER = os.getenv("DATA_PROVIDER", "yahoo")
 CSV_FILE_PATH = os.getenv("CSV_FILE_PATH", "data/XOM.csv")
+HEADLESS = os.getenv("HEADLESS", "0").lower() in ("1", "true", "yes")
+REPORTS_DIR = os.getenv("REPORTS_DIR", "reports")
 ALPACA_API_KEY_LIVE = os.getenv("ALPACA_API_KEY_LIVE")
 ALPACA_API_SECRET_LIVE = os.getenv("ALPACA_API_SECRET_LIVE")
 ALPACA_API_KEY_TEST = os.getenv("ALPACA_API_KEY_TEST")
@@ -32,7 +36,9 @@ STRATEGY_CONFIG = {
         'exit_zscore': 0.5,
         'max_position_hold': 20,
         'min_half_life': 5,
-        'confidence_level': 0.05
+        'confidence_level': 0.05,
+        # Fixed ADF lag for fast sweeps; None selects the lag by AIC on every test
+        'adf_lag': None
     }
 }
 
@@ -42,7 +48,9 @@ ML_CONFIG = {
         'lookback_window': 30,
         'hidden_units': 50,
         'epochs': 10,
-        'batch_size': 32
+        'batch_size': 32,
+        # Run inference on a TFLite copy of the trained model with int8 weights
+        'quantize': os.getenv("ML_QUANTIZE", "0").lower() in ("1", "true", "yes")
     }
 }
 
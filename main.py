@@ -1,11 +1,9 @@
 import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import cpu_count
 from src.core.data_provider import YahooDataProvider
-from src.core.csv_data_provider import CSVDataProvider
-from src.strategies.momentum_strategy import MomentumStrategy
-from src.strategies.mean_reversion_strategy import MeanReversionStrategy
-from src.strategies.statistical_arbitrage import StatisticalArbitrageStrategy
-from src.core.backtesting_engine import BacktestingEngine
-from src.core.risk_engine import RiskEngine
 from src.utils.logger import setup_logger
 from config.settings import (
     DEFAULT_TICKER,
@@ -14,59 +12,107 @@ from config.settings import (
     DEFAULT_END_DATE,
     INITIAL_CAPITAL,
     DB_PATH,
+    CACHE_BACKEND,
+    CACHE_DIR,
     DATA_PROVIDER,
     CSV_FILE_PATH,
+    HEADLESS,
+    REPORTS_DIR,
     STRATEGY_CONFIG
 )
-import matplotlib.pyplot as plt
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
+import numpy as np
 import pandas as pd
 
+# Strategies, the engines and the numba kernels are only imported by the backtest code paths,
+# so --mode ml does not pay for numba's import
+if TYPE_CHECKING:
+    from src.strategies.statistical_arbitrage import StatisticalArbitrageStrategy
+
 logger = setup_logger(__name__)
 
+def get_pyplot():
+    """Import pyplot on first use so runs that never plot skip the matplotlib import."""
+    import matplotlib
+    if HEADLESS:
+        # Batch runs render straight to PNG without a GUI event loop
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def create_data_provider():
+    """Create the configured data provider; the CSV provider is only imported when selected."""
+    if DATA_PROVIDER.lower() == 'csv':
+        from src.core.csv_data_provider import CSVDataProvider
+        return CSVDataProvider(CSV_FILE_PATH)
+    return YahooDataProvider(DEFAULT_TICKER, DEFAULT_START_DATE, DEFAULT_END_DATE, db_path=DB_PATH,
+                             cache_backend=CACHE_BACKEND, cache_dir=CACHE_DIR)
+
+def show_figure(name: str):
+    """Display the current figure, or save it to REPORTS_DIR and close it when running headless."""
+    plt = get_pyplot()
+    if HEADLESS:
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        plt.savefig(os.path.join(REPORTS_DIR, f"{name}.png"), dpi=100)
+        plt.close()
+    else:
+        plt.show()
+
 def plot_pair_analysis(price_data: pd.DataFrame, pair_name: str):
     """Plot pair trading analysis charts."""
+    from src.core._kernels import as_f64, rolling_corr
+    plt = get_pyplot()
     plt.figure(figsize=(15, 10))
     
+    # Pull both price series out as float64 arrays once; every panel below works off these
+    dates = price_data.index
+    close = as_f64(price_data['close'])
+    benchmark = as_f64(price_data['benchmark_close'])
+    
     # Plot 1: Price Series
     plt.subplot(2, 2, 1)
-    normalized_close = price_data['close'] / price_data['close'].iloc[0]
-    normalized_benchmark = price_data['benchmark_close'] / price_data['benchmark_close'].iloc[0]
-    plt.plot(normalized_close.index, normalized_close, label=DEFAULT_TICKER)
-    plt.plot(normalized_benchmark.index, normalized_benchmark, label=DEFAULT_BENCHMARK_TICKER)
+    plt.plot(dates, close / close[0], label=DEFAULT_TICKER)
+    plt.plot(dates, benchmark / benchmark[0], label=DEFAULT_BENCHMARK_TICKER)
     plt.title('Normalized Price Series')
     plt.legend()
     plt.grid(True)
     
     # Plot 2: Spread
     plt.subplot(2, 2, 2)
-    spread = price_data['close'] - price_data['benchmark_close']
-    plt.plot(spread.index, spread)
+    plt.plot(dates, close - benchmark)
     plt.title('Price Spread')
     plt.grid(True)
     
+    # Daily returns are computed once and shared by the correlation and density plots
+    returns1 = np.empty_like(close)
+    returns2 = np.empty_like(benchmark)
+    returns1[:1] = returns2[:1] = np.nan
+    returns1[1:] = close[1:] / close[:-1] - 1
+    returns2[1:] = benchmark[1:] / benchmark[:-1] - 1
+    
     # Plot 3: Rolling Correlation
     plt.subplot(2, 2, 3)
-    rolling_corr = price_data['close'].rolling(window=60).corr(price_data['benchmark_close'])
-    plt.plot(rolling_corr.index, rolling_corr)
+    corr = rolling_corr(returns1, returns2, 60)
+    plt.plot(dates, corr)
     plt.title('60-Day Rolling Correlation')
     plt.grid(True)
     
-    # Plot 4: Returns Scatter
+    # Plot 4: Returns density; hexbin draws one patch per occupied bin rather than one per day
     plt.subplot(2, 2, 4)
-    returns1 = price_data['close'].pct_change()
-    returns2 = price_data['benchmark_close'].pct_change()
-    plt.scatter(returns1, returns2, alpha=0.5)
+    valid = np.isfinite(returns1) & np.isfinite(returns2)
+    plt.hexbin(returns1[valid], returns2[valid], gridsize=60, mincnt=1, cmap='viridis')
+    plt.colorbar(label='Days')
     plt.xlabel(f'{DEFAULT_TICKER} Returns')
     plt.ylabel(f'{DEFAULT_BENCHMARK_TICKER} Returns')
-    plt.title('Daily Returns Scatter')
+    plt.title('Daily Returns Density')
     plt.grid(True)
     
     plt.tight_layout()
-    plt.show()
+    show_figure(f"{pair_name}_pair_analysis")
 
-def create_enhanced_statistical_arbitrage() -> StatisticalArbitrageStrategy:
+def create_enhanced_statistical_arbitrage() -> "StatisticalArbitrageStrategy":
     """Create a statistical arbitrage strategy using configuration from settings.py."""
+    from src.strategies.statistical_arbitrage import StatisticalArbitrageStrategy
     config = STRATEGY_CONFIG['statistical_arbitrage']
     return StatisticalArbitrageStrategy(
         lookback_period=config['lookback_period'],
@@ -74,21 +120,32 @@ def create_enhanced_statistical_arbitrage() -> StatisticalArbitrageStrategy:
         exit_zscore=config['exit_zscore'],
         max_position_hold=config['max_position_hold'],
         min_half_life=config['min_half_life'],
-        confidence_level=config['confidence_level']
+        confidence_level=config['confidence_level'],
+        adf_lag=config['adf_lag']
     )
 
+def compute_risk_metrics(results: pd.DataFrame, factor_returns: Optional[pd.DataFrame] = None):
+    """Tail, drawdown and (optionally) factor metrics for one strategy; module-level so it pickles."""
+    from src.core.risk_engine import RiskEngine
+    risk = RiskEngine(results)
+    factor_metrics = risk.calculate_factor_exposures(factor_returns) if factor_returns is not None else None
+    return risk.calculate_tail_risk_metrics(), risk.calculate_drawdown_metrics(), factor_metrics
+
 def analyze_strategy_results(results_dict: Dict[str, pd.DataFrame],
                              factor_returns: Optional[pd.DataFrame] = None):
     """Analyze strategy results with enhanced metrics."""
-    for strategy_name, results in results_dict.items():
-        from src.core.risk_engine import RiskEngine
-        risk = RiskEngine(results)
-        tail_metrics = risk.calculate_tail_risk_metrics()
-        drawdown_metrics = risk.calculate_drawdown_metrics()
+    if not results_dict:
+        return
+    # Each strategy's metrics only read its own results frame, so compute them in parallel,
+    # with one BLAS thread per worker process so the pool does not oversubscribe the cores
+    from threadpoolctl import threadpool_limits
+    max_workers = min(len(results_dict), cpu_count())
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=threadpool_limits,
+                             initargs=(1,)) as executor:
+        all_metrics = list(executor.map(partial(compute_risk_metrics, factor_returns=factor_returns),
+                                        results_dict.values()))
         
-        if factor_returns is not None:
-            factor_metrics = risk.calculate_factor_exposures(factor_returns)
-            
+    for strategy_name, (tail_metrics, drawdown_metrics, factor_metrics) in zip(results_dict, all_metrics):
         logger.info(f"\n{strategy_name} Analysis:")
         logger.info("Tail Risk Metrics:")
         for metric, value in tail_metrics.items():
@@ -111,8 +168,6 @@ def analyze_strategy_results(results_dict: Dict[str, pd.DataFrame],
 def run_ml_model():
     from config.settings import ML_CONFIG
     from src.ml.regime_detector import RegimeDetector
-    from src.core.csv_data_provider import CSVDataProvider
-    from src.core.data_provider import YahooDataProvider
     ml_params = ML_CONFIG['regime_detector']
     regime_detector = RegimeDetector(
         lookback_window=ml_params['lookback_window'],
@@ -120,33 +175,35 @@ def run_ml_model():
         epochs=ml_params['epochs'],
         batch_size=ml_params['batch_size']
     )
-    provider = CSVDataProvider(CSV_FILE_PATH) if DATA_PROVIDER.lower() == 'csv' else \
-               YahooDataProvider(DEFAULT_TICKER, DEFAULT_START_DATE, DEFAULT_END_DATE, db_path=DB_PATH)
-    data = provider.load_data()
+    data = create_data_provider().load_data()
     regime_detector.train(data['close'])
+    if ml_params['quantize']:
+        regime_detector.quantize()
     predictions = regime_detector.predict(data['close'])
+    plt = get_pyplot()
     plt.figure(figsize=(12, 6))
     plt.plot(data.index[ml_params['lookback_window']:], predictions, label='Predicted Regime')
     plt.plot(data.index, data['close'], label='Price')
     plt.legend()
     plt.title('Regime Detection using LSTM')
-    plt.show()
+    show_figure(f"{DEFAULT_TICKER}_regimes")
 
 def main_backtest():
-    from src.core.csv_data_provider import CSVDataProvider
-    from src.core.data_provider import YahooDataProvider
+    from src.strategies.momentum_strategy import MomentumStrategy
+    from src.strategies.mean_reversion_strategy import MeanReversionStrategy
+    from src.core.backtesting_engine import BacktestingEngine
+    from src.core.panel import PricePanel
     # Choose the appropriate data provider
-    provider = CSVDataProvider(CSV_FILE_PATH) if DATA_PROVIDER.lower() == 'csv' else \
-               YahooDataProvider(DEFAULT_TICKER, DEFAULT_START_DATE, DEFAULT_END_DATE, db_path=DB_PATH)
-    data = provider.load_data()
+    data = create_data_provider().load_data()
     logger.info(f"Data loaded for {DEFAULT_TICKER}")
     
     # Load benchmark data
-    benchmark_provider = YahooDataProvider(DEFAULT_BENCHMARK_TICKER, DEFAULT_START_DATE, DEFAULT_END_DATE, db_path=DB_PATH)
+    benchmark_provider = YahooDataProvider(DEFAULT_BENCHMARK_TICKER, DEFAULT_START_DATE, DEFAULT_END_DATE, db_path=DB_PATH,
+                                           cache_backend=CACHE_BACKEND, cache_dir=CACHE_DIR)
     benchmark_data = benchmark_provider.load_data()
-    data = data.join(benchmark_data[['close']].rename(columns={'close': 'benchmark_close'}), how='inner')
-    data['benchmark_close'] = data['benchmark_close'].ffill()
-    data = data.dropna(subset=['benchmark_close'])
+    # Align both closes on their common dates; the strategies only read these two columns
+    panel = PricePanel.from_frames({DEFAULT_TICKER: data, DEFAULT_BENCHMARK_TICKER: benchmark_data})
+    data = panel.pair_frame(DEFAULT_TICKER, DEFAULT_BENCHMARK_TICKER)
     
     # Compute returns
     data['returns'] = data['close'].pct_change()
@@ -164,7 +221,6 @@ def main_backtest():
     stat_arb_strategy = create_enhanced_statistical_arbitrage()
     
     strategies = [momentum_strategy, mean_reversion_strategy, stat_arb_strategy]
-    from src.core.backtesting_engine import BacktestingEngine
     engine = BacktestingEngine(strategies=strategies, initial_capital=INITIAL_CAPITAL)
     
     results_dict = engine.run_all(data)
@@ -172,17 +228,20 @@ def main_backtest():
     analyze_strategy_results(results_dict)
     
     # Plot cumulative returns
+    plt = get_pyplot()
     plt.figure(figsize=(15, 7))
     for strategy_name, results in results_dict.items():
         plt.plot(results.index, results['cumulative_strategy'], 
                  label=f'{strategy_name} (Return: {(results["cumulative_strategy"].iloc[-1] / INITIAL_CAPITAL - 1) * 100:.1f}%)')
-    plt.plot(results.index, results['cumulative_market'], label='Market', alpha=0.7)
+    # The market curve is identical across strategies, so draw it once
+    cum_market = next(iter(results_dict.values()))['cumulative_market']
+    plt.plot(cum_market.index, cum_market, label='Market', alpha=0.7)
     plt.title('Strategy Performance Comparison')
     plt.xlabel('Date')
     plt.ylabel('Portfolio Value ($)')
     plt.legend()
     plt.grid(True)
-    plt.show()
+    show_figure("strategy_equity")
 
 def main():
     parser = argparse.ArgumentParser(description="Quantitative Trading Engine")
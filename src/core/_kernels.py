@@ -0,0 +1,437 @@
+# src/core/_kernels.py
+
+import math
+import numpy as np
+import pandas as pd
+from src.utils._njit import njit
+
+def as_f64(values) -> np.ndarray:
+    """
+    Contiguous float64 array for a Series, Index or array (Arrow nulls become NaN).
+    Convert once at the top of a method and stay in NumPy from there on.
+    """
+    if isinstance(values, (pd.Series, pd.Index)):
+        values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+@njit
+def run_backtest(close, signals, capital):
+    """
+    Fused backtest over an (N, K) signal matrix: derives the market returns from the close prices,
+    shifts every signal column, applies it to the returns and compounds the market and all K
+    strategy equity curves in one row-major pass. NaN returns leave the equity unchanged.
+    Returns (returns, strategy returns, strategy equity, market equity).
+    """
+    n, k = signals.shape
+    returns = np.empty(n)
+    strat_ret = np.empty((n, k))
+    cum_strategy = np.empty((n, k))
+    cum_market = np.empty(n)
+    if n == 0:
+        return returns, strat_ret, cum_strategy, cum_market
+    equity = np.full(k, capital)
+    market_equity = capital
+    returns[0] = np.nan
+    strat_ret[0, :] = np.nan
+    cum_strategy[0, :] = capital
+    cum_market[0] = capital
+    for i in range(1, n):
+        market = close[i] / close[i - 1] - 1.0
+        returns[i] = market
+        if not np.isnan(market):
+            market_equity *= 1.0 + market
+        cum_market[i] = market_equity
+        for j in range(k):
+            r = signals[i - 1, j] * market
+            strat_ret[i, j] = r
+            if not np.isnan(r):
+                equity[j] *= 1.0 + r
+            cum_strategy[i, j] = equity[j]
+    return returns, strat_ret, cum_strategy, cum_market
+
+@njit
+def rolling_corr(x, y, window):
+    """
+    O(N) rolling Pearson correlation maintaining running sums of x, y, x^2, y^2 and xy.
+    Like pandas, a window yields NaN unless all of its observations are valid.
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    sx = sy = sxx = syy = sxy = 0.0
+    count = 0
+    for i in range(n):
+        xi = x[i]
+        yi = y[i]
+        if not (np.isnan(xi) or np.isnan(yi)):
+            sx += xi
+            sy += yi
+            sxx += xi * xi
+            syy += yi * yi
+            sxy += xi * yi
+            count += 1
+        if i >= window:
+            xo = x[i - window]
+            yo = y[i - window]
+            if not (np.isnan(xo) or np.isnan(yo)):
+                sx -= xo
+                sy -= yo
+                sxx -= xo * xo
+                syy -= yo * yo
+                sxy -= xo * yo
+                count -= 1
+        if count == window:
+            var_x = sxx - sx * sx / window
+            var_y = syy - sy * sy / window
+            if var_x > 0.0 and var_y > 0.0:
+                out[i] = (sxy - sx * sy / window) / np.sqrt(var_x * var_y)
+    return out
+
+@njit
+def rolling_mean(x, window):
+    """
+    O(N) rolling mean over a running sum. Like pandas with min_periods=window,
+    a window yields NaN unless all of its observations are valid.
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    count = 0
+    for i in range(n):
+        xi = x[i]
+        if not np.isnan(xi):
+            total += xi
+            count += 1
+        if i >= window:
+            xo = x[i - window]
+            if not np.isnan(xo):
+                total -= xo
+                count -= 1
+        if count == window:
+            out[i] = total / window
+    return out
+
+@njit
+def rolling_zscore(x, window, min_periods):
+    """
+    Single-pass rolling z-score against the window mean and sample standard deviation (ddof=1),
+    using Welford add/remove updates. NaNs are skipped; windows with fewer than min_periods valid
+    values, a zero or undefined std, or a NaN input give 0 rather than NaN.
+    """
+    n = x.shape[0]
+    out = np.zeros(n)
+    min_periods = max(min_periods, 1)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    # Length of the current run of equal values, so flat windows get an exact zero std
+    same_run = 0
+    prev = np.nan
+    for i in range(n):
+        xi = x[i]
+        if not np.isnan(xi):
+            count += 1
+            delta = xi - mean
+            mean += delta / count
+            m2 += delta * (xi - mean)
+            same_run = same_run + 1 if xi == prev else 1
+            prev = xi
+        if i >= window:
+            xo = x[i - window]
+            if not np.isnan(xo):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = xo - mean
+                    mean -= delta / count
+                    m2 -= delta * (xo - mean)
+        if count >= min_periods and count > 1 and same_run < count and not np.isnan(xi):
+            std = np.sqrt(max(m2, 0.0) / (count - 1))
+            if std > 0.0:
+                z = (xi - mean) / std
+                if np.isfinite(z):
+                    out[i] = z
+    return out
+
+@njit
+def norm_ppf(p):
+    """
+    Standard normal quantile: Acklam's rational approximation refined with one Halley step,
+    accurate to double precision without going through scipy.
+    """
+    if p <= 0.0:
+        return -np.inf
+    if p >= 1.0:
+        return np.inf
+    if p < 0.02425:
+        q = math.sqrt(-2.0 * math.log(p))
+        x = ((((((-7.784894002430293e-03 * q - 3.223964580411365e-01) * q - 2.400758277161838e+00) * q
+                - 2.549671010135111e+00) * q + 4.374664141464968e+00) * q + 2.938163982698783e+00)
+             / ((((7.784695709041462e-03 * q + 3.224671290700398e-01) * q + 2.445134137142996e+00) * q
+                 + 3.754408661907416e+00) * q + 1.0))
+    elif p > 1.0 - 0.02425:
+        q = math.sqrt(-2.0 * math.log(1.0 - p))
+        x = -((((((-7.784894002430293e-03 * q - 3.223964580411365e-01) * q - 2.400758277161838e+00) * q
+                 - 2.549671010135111e+00) * q + 4.374664141464968e+00) * q + 2.938163982698783e+00)
+              / ((((7.784695709041462e-03 * q + 3.224671290700398e-01) * q + 2.445134137142996e+00) * q
+                  + 3.754408661907416e+00) * q + 1.0))
+    else:
+        q = p - 0.5
+        r = q * q
+        x = ((((((-3.969683028665376e+01 * r + 2.209460984245205e+02) * r - 2.759285104469687e+02) * r
+                + 1.383577518672690e+02) * r - 3.066479806614716e+01) * r + 2.506628277459239e+00) * q
+             / (((((-5.447609879822406e+01 * r + 1.615858368580409e+02) * r - 1.556989798598866e+02) * r
+                  + 6.680131188771972e+01) * r - 1.328068155288572e+01) * r + 1.0))
+    e = 0.5 * math.erfc(-x / math.sqrt(2.0)) - p
+    u = e * math.sqrt(2.0 * math.pi) * math.exp(0.5 * x * x)
+    return x - u / (1.0 + 0.5 * x * u)
+
+@njit
+def fit_genpareto_pwm(x):
+    """
+    Probability-weighted-moments fit of a generalized Pareto distribution located at 0.
+    Returns (shape, scale) in scipy's genpareto convention; NaNs when the moments are degenerate.
+    """
+    n = x.shape[0]
+    if n < 2:
+        return np.nan, np.nan
+    xs = np.sort(x)
+    mean = 0.0
+    b1 = 0.0
+    for i in range(n):
+        mean += xs[i]
+        b1 += xs[i] * i / (n - 1)
+    mean /= n
+    b1 /= n
+    denom = 2.0 * b1 - mean
+    if denom <= 0.0:
+        return np.nan, np.nan
+    shape = 2.0 - mean / denom
+    scale = (1.0 - shape) * mean
+    if scale <= 0.0:
+        return np.nan, np.nan
+    return shape, scale
+
+@njit
+def fit_genpareto_mom(x):
+    """
+    Method-of-moments fit of a generalized Pareto distribution located at 0, from the sample mean
+    and variance. Returns (shape, scale) in scipy's genpareto convention; NaNs when the moments are degenerate.
+    """
+    n = x.shape[0]
+    if n < 2:
+        return np.nan, np.nan
+    mean = 0.0
+    for i in range(n):
+        mean += x[i]
+    mean /= n
+    var = 0.0
+    for i in range(n):
+        var += (x[i] - mean) * (x[i] - mean)
+    var /= n - 1
+    if var <= 0.0 or mean <= 0.0:
+        return np.nan, np.nan
+    ratio = mean * mean / var
+    return 0.5 * (1.0 - ratio), 0.5 * mean * (1.0 + ratio)
+
+@njit
+def genpareto_ppf(q, shape, scale):
+    """Generalized Pareto quantile function (location 0) in scipy's genpareto convention."""
+    if abs(shape) < 1e-12:
+        return -scale * math.log1p(-q)
+    return scale / shape * ((1.0 - q) ** (-shape) - 1.0)
+
+def enforce_hold(signals: np.ndarray, max_hold: int) -> np.ndarray:
+    """
+    Flatten positions held for max_hold bars or more since their entry. Entries are changes
+    in the incoming signal, so bars flattened here do not count as new entries.
+    Vectorized, so it is as fast without numba: the last entry is forward-filled with a running max.
+    """
+    bars = np.arange(signals.shape[0])
+    entry = np.empty(signals.shape[0], dtype=np.bool_)
+    entry[:1] = signals[:1] != 0
+    np.not_equal(signals[1:], signals[:-1], out=entry[1:])
+    last_entry = np.maximum.accumulate(np.where(entry, bars, -1))
+    out = signals.copy()
+    # Bars before the first entry are already flat, so they need no special case
+    out[(bars - last_entry >= max_hold) & ~entry] = 0
+    return out
+
+@njit
+def ols1d(x, y):
+    """
+    Closed-form simple regression of y on x with an intercept, returning (slope, intercept).
+    A constant x gets slope 0, as with a minimum-norm least-squares solution.
+    """
+    n = x.shape[0]
+    x_mean = 0.0
+    y_mean = 0.0
+    for i in range(n):
+        x_mean += x[i]
+        y_mean += y[i]
+    x_mean /= n
+    y_mean /= n
+    sxx = 0.0
+    sxy = 0.0
+    for i in range(n):
+        dx = x[i] - x_mean
+        sxx += dx * dx
+        sxy += dx * (y[i] - y_mean)
+    slope = sxy / sxx if sxx > 0.0 else 0.0
+    return slope, y_mean - slope * x_mean
+
+@njit
+def rolling_hedge_ratio(x, y, window):
+    """
+    OLS slopes of y on x over the windows [i - window, i) for i in [window, n), from running sums
+    updated one observation at a time. Inputs should be centred to keep the sums well conditioned.
+    Flat windows leave only rounding noise in the denominator and get slope 0, as with lstsq.
+    """
+    n = x.shape[0]
+    out = np.empty(n - window)
+    sx = 0.0
+    sy = 0.0
+    sxx = 0.0
+    sxy = 0.0
+    for i in range(window):
+        sx += x[i]
+        sy += y[i]
+        sxx += x[i] * x[i]
+        sxy += x[i] * y[i]
+    for i in range(window, n):
+        denom = window * sxx - sx * sx
+        if denom <= 1e-10 * window * sxx:
+            out[i - window] = 0.0
+        else:
+            out[i - window] = (window * sxy - sx * sy) / denom
+        # Slide the window: add x[i], drop x[i - window]
+        xo = x[i - window]
+        yo = y[i - window]
+        sx += x[i] - xo
+        sy += y[i] - yo
+        sxx += x[i] * x[i] - xo * xo
+        sxy += x[i] * y[i] - xo * yo
+    return out
+
+@njit
+def drawdown_stats(values, ts_ns):
+    """
+    Single pass over an equity curve and its int64 nanosecond timestamps returning
+    (max drawdown, mean negative drawdown, mean recovery time in whole days, number of recoveries).
+    NaN values are skipped by the running peak, as np.fmax.accumulate does; a drawdown still
+    open at the end of the series has no recovery yet.
+    """
+    day_ns = 86400 * 10**9
+    peak = np.nan
+    lowest = np.nan
+    neg_sum = 0.0
+    neg_count = 0
+    in_drawdown = False
+    start_ns = 0
+    recovery_days = 0
+    recoveries = 0
+    for i in range(values.shape[0]):
+        v = values[i]
+        if not np.isnan(v) and (np.isnan(peak) or v > peak):
+            peak = v
+        d = (v - peak) / peak
+        below = False
+        if not np.isnan(d):
+            if np.isnan(lowest) or d < lowest:
+                lowest = d
+            if d < 0.0:
+                neg_sum += d
+                neg_count += 1
+                below = True
+        if below and not in_drawdown:
+            start_ns = ts_ns[i]
+        elif in_drawdown and not below:
+            recovery_days += (ts_ns[i] - start_ns) // day_ns
+            recoveries += 1
+        in_drawdown = below
+    avg_drawdown = neg_sum / neg_count if neg_count else 0.0
+    avg_recovery = recovery_days / recoveries if recoveries else 0.0
+    return lowest, avg_drawdown, avg_recovery, recoveries
+
+@njit
+def _adf_design(x, xdiff, lag, nobs):
+    """Regress Δx_t on [x_{t-1}, 1, Δx_{t-1}, ..., Δx_{t-lag}] over the last nobs differences."""
+    start = x.shape[0] - 1 - nobs
+    y = np.empty(nobs)
+    X = np.empty((nobs, lag + 2))
+    for t in range(nobs):
+        j = start + t
+        y[t] = xdiff[j]
+        X[t, 0] = x[j]
+        X[t, 1] = 1.0
+        for l in range(1, lag + 1):
+            X[t, l + 1] = xdiff[j - l]
+    return y, X
+
+@njit
+def _ols_qr(y, X):
+    """Least squares via a thin QR; returns the coefficients, residual sum of squares and R."""
+    q, r = np.linalg.qr(X)
+    # numba types q with an unknown layout, and dot is only fast on contiguous arrays; y @ q is q.T @ y
+    beta = np.linalg.solve(r, np.dot(y, np.ascontiguousarray(q)))
+    resid = y - np.dot(X, beta)
+    return beta, np.dot(resid, resid), r
+
+@njit
+def adf_tstat(x, maxlag):
+    """
+    Augmented Dickey-Fuller t-statistic with a constant, choosing the lag length by AIC
+    over a common sample exactly as statsmodels' adfuller(autolag='AIC') does.
+    """
+    n = x.shape[0]
+    xdiff = np.diff(x)
+    # Lag selection: every candidate is fitted on the same observations so the AICs compare
+    nobs = n - 1 - maxlag
+    best_aic = np.inf
+    best_lag = 0
+    for lag in range(maxlag + 1):
+        y, X = _adf_design(x, xdiff, lag, nobs)
+        _, ssr, _ = _ols_qr(y, X)
+        llf = -0.5 * nobs * (math.log(2.0 * math.pi) + math.log(ssr / nobs) + 1.0)
+        aic = -2.0 * llf + 2.0 * (lag + 2)
+        if aic < best_aic:
+            best_aic = aic
+            best_lag = lag
+    # Refit the chosen lag on all the observations it allows
+    return adf_tstat_lag(x, best_lag)
+
+@njit
+def adf_tstat_lag(x, lag):
+    """
+    Augmented Dickey-Fuller t-statistic with a constant for a fixed lag length, as statsmodels'
+    adfuller(maxlag=lag, autolag=None) computes it; a single regression with no lag search.
+    """
+    n = x.shape[0]
+    xdiff = np.diff(x)
+    nobs = n - 1 - lag
+    k = lag + 2
+    y, X = _adf_design(x, xdiff, lag, nobs)
+    beta, ssr, r = _ols_qr(y, X)
+    # Var(beta_0) / sigma^2 is the first diagonal entry of (X'X)^-1 = R^-1 R^-T
+    r_inv = np.linalg.inv(r)
+    var0 = 0.0
+    for c in range(k):
+        var0 += r_inv[0, c] * r_inv[0, c]
+    return beta[0] / math.sqrt(ssr / (nobs - k) * var0)
+
+@njit
+def mackinnon_pvalue(stat):
+    """
+    MacKinnon (1994) approximate p-value for an ADF statistic with a constant and one I(1) series,
+    using the same response-surface coefficients as statsmodels' mackinnonp.
+    """
+    if stat > 2.74:
+        return 1.0
+    if stat < -18.83:
+        return 0.0
+    if stat <= -1.61:
+        z = 2.1659 + stat * (1.4412 + stat * 0.038269)
+    else:
+        z = 1.7339 + stat * (0.93202 + stat * (-0.12745 + stat * -0.010368))
+    return 0.5 * math.erfc(-z / math.sqrt(2.0))
@@ -1,36 +1,116 @@
 # src/core/backtesting_engine.py
 
+import hashlib
+import numpy as np
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count
+from threadpoolctl import threadpool_limits
 from typing import List, Dict
 from src.strategies.base_strategy import BaseStrategy
+from src.core._kernels import as_f64, run_backtest
+
+# Signal arrays remembered per engine, least recently used evicted first
+SIGNAL_CACHE_SIZE = 256
+
+def _data_fingerprint(data: pd.DataFrame) -> str:
+    """Content hash of the input frame (values and index) used to key cached signals."""
+    row_hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+def _strategy_params(strategy: BaseStrategy) -> Dict[str, object]:
+    """Attribute values of a strategy, whether stored in __slots__ or an instance __dict__."""
+    params = dict(getattr(strategy, '__dict__', {}))
+    for cls in type(strategy).__mro__:
+        slots = getattr(cls, '__slots__', ())
+        for name in ((slots,) if isinstance(slots, str) else slots):
+            if hasattr(strategy, name):
+                params[name] = getattr(strategy, name)
+    return params
+
+def _signal_cache_key(strategy: BaseStrategy, fingerprint: str) -> str:
+    # Public attributes are the strategy parameters; private ones are internal state
+    params = sorted((k, v) for k, v in _strategy_params(strategy).items() if not k.startswith('_'))
+    return f"{type(strategy).__name__}:{params!r}:{fingerprint}"
+
+def _generate_signal(strategy: BaseStrategy, data: pd.DataFrame) -> np.ndarray:
+    """
+    Generate a single strategy's signal. Module-level so it can be pickled into worker processes.
+    The backtest itself runs once for all strategies in the parent.
+    """
+    # Prefer the raw-NumPy sliding-window path when the strategy provides one
+    signal = strategy.vectorized_signal(as_f64(data['close']))
+    if signal is None:
+        # Generate signals using the strategy (which already handles column names)
+        signal = strategy.generate_signals(data)
+    return as_f64(signal)
+
+# Input frame of the current run_all, installed once per worker process by the pool initializer
+_WORKER_DATA = None
+
+def _init_worker(data: pd.DataFrame) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = data
+    # Workers already fill every core, so BLAS/OpenMP threads inside them would only oversubscribe
+    threadpool_limits(limits=1)
+
+def _generate_worker_signal(strategy: BaseStrategy) -> np.ndarray:
+    return _generate_signal(strategy, _WORKER_DATA)
 
 class BacktestingEngine:
     def __init__(self, strategies: List[BaseStrategy], initial_capital: float = 100000.0):
         self.strategies = strategies
         self.initial_capital = initial_capital
-
-    def _backtest_strategy(self, strategy: BaseStrategy, data: pd.DataFrame) -> pd.DataFrame:
-        df = data.copy()
-        # Generate signals using the strategy (which already handles column names)
-        df['signal'] = strategy.generate_signals(df)
-        # Calculate daily returns using the 'close' column
-        df['returns'] = df['close'].pct_change()
-        # Compute strategy returns; shift the signal to avoid lookahead bias
-        df['strategy_returns'] = df['signal'].shift(1) * df['returns']
-        # Compute cumulative returns for the strategy and the market
-        df['cumulative_strategy'] = (1 + df['strategy_returns']).cumprod() * self.initial_capital
-        df['cumulative_market'] = (1 + df['returns']).cumprod() * self.initial_capital
-        return df
+        # Signals keyed by strategy parameters and input data, reused across run_all calls
+        self._signal_cache: OrderedDict = OrderedDict()
 
     def run_all(self, data: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         results = {}
-        with ThreadPoolExecutor() as executor:
-            future_to_strategy = {
-                executor.submit(self._backtest_strategy, strat, data): strat
-                for strat in self.strategies
-            }
-            for future in as_completed(future_to_strategy):
-                strat = future_to_strategy[future]
-                results[str(type(strat).__name__)] = future.result()
-        return results
\ No newline at end of file
+        if not self.strategies:
+            return results
+        fingerprint = _data_fingerprint(data)
+        keys = [_signal_cache_key(strat, fingerprint) for strat in self.strategies]
+        # Signals of this run are collected here, so eviction below cannot drop one before it is used
+        run_signals: Dict[str, np.ndarray] = {}
+        pending = []
+        for strat, key in zip(self.strategies, keys):
+            if key in self._signal_cache:
+                self._signal_cache.move_to_end(key)
+                run_signals[key] = self._signal_cache[key]
+            else:
+                pending.append((strat, key))
+        if pending:
+            # Caches filled in workers are lost with the pool, so let strategies warm theirs here first
+            for strat, _ in pending:
+                strat.prepare(data)
+            # Strategies spend most of their time holding the GIL, so run each one in its own process
+            max_workers = min(len(pending), cpu_count())
+            # map keeps input order, and chunksize batches strategies per IPC round trip once they outnumber workers
+            chunksize = max(1, len(pending) // (4 * max_workers))
+            # The data is pickled once per worker by the initializer, not once per task
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(data,)) as executor:
+                generated = executor.map(_generate_worker_signal,
+                                          [strat for strat, _ in pending], chunksize=chunksize)
+                for (_, key), signal in zip(pending, generated):
+                    signal.setflags(write=False)
+                    run_signals[key] = self._signal_cache[key] = signal
+            while len(self._signal_cache) > SIGNAL_CACHE_SIZE:
+                self._signal_cache.popitem(last=False)
+
+        # Stack the signals column-wise and backtest the market and every strategy in a single pass
+        signals = np.column_stack([run_signals[key] for key in keys])
+        returns, strat_ret, cum_strategy, cum_market = run_backtest(as_f64(data['close']), signals,
+                                                                    float(self.initial_capital))
+        # Result frames wrap views of each strategy's own columns instead of copying them; the market
+        # columns are common to every frame, so each gets its own copy and edits to one cannot leak
+        for j, strat in enumerate(self.strategies):
+            results[str(type(strat).__name__)] = pd.DataFrame({
+                'signal': signals[:, j],
+                'returns': returns.copy(),
+                'strategy_returns': strat_ret[:, j],
+                'cumulative_strategy': cum_strategy[:, j],
+                'cumulative_market': cum_market.copy()
+            }, index=data.index, copy=False)
+        return results
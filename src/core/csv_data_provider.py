@@ -4,6 +4,16 @@ import os
 import pandas as pd
 from src.core.data_provider import DataProvider
 
+# Only the OHLCV columns are read; everything downstream works off these.
+CSV_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+CSV_DTYPES = {
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Volume': 'float64'
+}
+
 class CSVDataProvider(DataProvider):
     def __init__(self, csv_file: str):
         self.csv_file = csv_file
@@ -11,8 +21,17 @@ class CSVDataProvider(DataProvider):
     def load_data(self) -> pd.DataFrame:
         if not os.path.exists(self.csv_file):
             raise FileNotFoundError(f"CSV file {self.csv_file} not found.")
-        # Read CSV with a Date column as the index.
-        data = pd.read_csv(self.csv_file, parse_dates=['Date'], index_col='Date')
+        # Read only the OHLCV columns with explicit dtypes.
+        read_kwargs = dict(parse_dates=['Date'], usecols=CSV_COLUMNS)
+        try:
+            # The pyarrow engine parses columnar and multi-threaded into Arrow-backed columns
+            arrow_dtypes = {col: f"{dtype}[pyarrow]" for col, dtype in CSV_DTYPES.items()}
+            data = pd.read_csv(self.csv_file, engine='pyarrow', dtype=arrow_dtypes,
+                               dtype_backend='pyarrow', **read_kwargs)
+        except ImportError:
+            data = pd.read_csv(self.csv_file, engine='c', dtype=CSV_DTYPES, **read_kwargs)
+        # Use the Date column as the index.
+        data = self._ensure_datetime_index(data.set_index('Date'))
         # Normalize column names to lowercase.
         data.columns = [col.lower() for col in data.columns]
-        return data
\ No newline at end of file
+        return self._to_float64_block(data)
@@ -1,11 +1,17 @@
 # src/core/data_provider.py
 
+import functools
 import os
+import re
 import sqlite3
+import threading
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Tuple
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
 
 class DataProvider(ABC):
     @abstractmethod
@@ -13,82 +19,245 @@ class DataProvider(ABC):
         """Abstract method to load market data."""
         pass
 
+    @staticmethod
+    def _ensure_datetime_index(data: pd.DataFrame) -> pd.DataFrame:
+        """Arrow-backed readers return date32/timestamp indexes; date slicing needs a DatetimeIndex."""
+        if not isinstance(data.index, pd.DatetimeIndex):
+            data.index = pd.DatetimeIndex(data.index)
+        return data
+
+    @staticmethod
+    def _to_float64_block(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rebuild the OHLCV columns as a single float64 block with each column contiguous,
+        so strategies and kernels downstream never pay a dtype or layout conversion.
+        """
+        block = np.empty((len(OHLCV_COLUMNS), len(data)), dtype=np.float64)
+        for row, col in zip(block, OHLCV_COLUMNS):
+            row[:] = data[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        return pd.DataFrame(block.T, index=data.index, columns=OHLCV_COLUMNS, copy=False)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Gaps between the requested and cached range shorter than this are weekends/holidays
+CACHE_GAP_TOLERANCE = pd.Timedelta(days=4)
+# Parquet schema metadata key holding the date span already requested from Yahoo
+COVERAGE_KEY = b'qte_coverage'
+# Serializes writes on the shared SQLite connections
+_DB_WRITE_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _get_conn(db_path: str) -> sqlite3.Connection:
+    """One connection per database file, shared by every provider for the life of the process."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
 class YahooDataProvider(DataProvider):
-    def __init__(self, ticker: str, start_date: str, end_date: str, db_path: str = 'data/market_data.db'):
+    def __init__(self,
+                 ticker: str,
+                 start_date: str,
+                 end_date: str,
+                 db_path: str = 'data/market_data.db',
+                 cache_backend: str = 'parquet',
+                 cache_dir: str = 'data/cache'):
         self.ticker = ticker
         self.start_date = start_date
         self.end_date = end_date
         self.db_path = db_path
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.cache_backend = cache_backend.lower()
+        self.cache_dir = cache_dir
+        if self.cache_backend == 'parquet':
+            os.makedirs(cache_dir, exist_ok=True)
+        elif self.cache_backend == 'sqlite':
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        else:
+            raise ValueError(f"Unknown cache backend '{cache_backend}', expected 'parquet' or 'sqlite'.")
+
+    @property
+    def table_name(self) -> str:
+        """SQLite table holding this ticker's rows; one table per ticker keeps range scans tight."""
+        return "market_data_" + re.sub(r'\W', '_', self.ticker.lower())
+
+    @property
+    def parquet_path(self) -> str:
+        return os.path.join(self.cache_dir, f"{self.ticker}.parquet")
+
+    def _load_from_parquet(self) -> Optional[pd.DataFrame]:
+        if not os.path.exists(self.parquet_path):
+            return None
+        # Arrow-backed columns are handed downstream without a NumPy round trip
+        df = pd.read_parquet(self.parquet_path, columns=OHLCV_COLUMNS, dtype_backend='pyarrow')
+        df = self._ensure_datetime_index(df)
+        # [start, end) like yfinance's end argument and the SQLite range query, not .loc's closed slice
+        df = df[(df.index >= pd.Timestamp(self.start_date)) & (df.index < pd.Timestamp(self.end_date))]
+        return df if not df.empty else None
+
+    def _save_to_parquet(self, data: pd.DataFrame, coverage: Tuple[pd.Timestamp, pd.Timestamp]) -> None:
+        frames = [data[OHLCV_COLUMNS]] if not data.empty else []
+        # Merge with previously cached rows so other date ranges of this ticker are kept
+        if os.path.exists(self.parquet_path):
+            frames.insert(0, pd.read_parquet(self.parquet_path, columns=OHLCV_COLUMNS))
+        if not frames:
+            return
+        df = pd.concat(frames)
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        # Write the Arrow table directly rather than through the pandas to_parquet wrapper,
+        # with the requested span in the schema metadata next to pandas' own
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df.rename_axis('date'), preserve_index=True)
+        metadata = dict(table.schema.metadata or {})
+        metadata[COVERAGE_KEY] = f"{coverage[0]:%Y-%m-%d},{coverage[1]:%Y-%m-%d}".encode()
+        pq.write_table(table.replace_schema_metadata(metadata), self.parquet_path, compression='zstd')
 
     def _init_db(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS market_data (
-                ticker TEXT,
-                date TEXT,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume REAL,
-                PRIMARY KEY (ticker, date)
-            )
-        """)
-        conn.commit()
+        conn = _get_conn(self.db_path)
+        with _DB_WRITE_LOCK:
+            # WITHOUT ROWID clusters the rows on the date key, so range queries are a single B-tree walk
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS "{self.table_name}" (
+                    date TEXT PRIMARY KEY,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_coverage (
+                    ticker TEXT PRIMARY KEY,
+                    start TEXT,
+                    end TEXT
+                )
+            """)
+            conn.commit()
         return conn
 
     def _save_to_db(self, data: pd.DataFrame, conn: sqlite3.Connection) -> None:
         df = data.copy()
-        df = df.reset_index()
 
         # Convert all column names to lowercase strings
         df.columns = [str(col).lower() for col in df.columns]
-        
-        # Rename the date column if needed
-        if 'datetime' in df.columns:
-            df.rename(columns={'datetime': 'date'}, inplace=True)
-        
-        # Add ticker column
-        df['ticker'] = self.ticker
-        
-        # Write to SQLite
-        df.to_sql('market_data', conn, if_exists='replace', index=False)
+
+        # Bind plain tuples in one transaction; dates keep the 'YYYY-MM-DD HH:MM:SS' text keys
+        dates = pd.DatetimeIndex(df.index).strftime('%Y-%m-%d %H:%M:%S')
+        values = df[OHLCV_COLUMNS].to_numpy(dtype=np.float64, na_value=np.nan)
+        rows = zip(dates, *values.T.tolist())
+        with conn:
+            # Never replace previously cached rows
+            conn.executemany(f"""
+                INSERT OR IGNORE INTO "{self.table_name}" (date, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
 
     def _load_from_db(self, conn: sqlite3.Connection) -> Optional[pd.DataFrame]:
         query = f"""
-            SELECT date, open, high, low, close, volume FROM market_data
-            WHERE ticker = '{self.ticker}' AND date BETWEEN '{self.start_date}' AND '{self.end_date}'
+            SELECT date, open, high, low, close, volume FROM "{self.table_name}"
+            WHERE date BETWEEN ? AND ?
             ORDER BY date ASC
         """
-        df = pd.read_sql_query(query, conn, parse_dates=['date'], index_col='date')
+        df = pd.read_sql_query(query, conn, params=(self.start_date, self.end_date),
+                               parse_dates=['date'], index_col='date', dtype_backend='pyarrow')
         return df if not df.empty else None
 
-    def load_data(self) -> pd.DataFrame:
+    def _load_from_cache(self) -> Optional[pd.DataFrame]:
+        if self.cache_backend == 'parquet':
+            return self._load_from_parquet()
+        return self._load_from_db(self._init_db())
+
+    def _coverage(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Inclusive date span already requested from Yahoo for the ticker, whether or not it returned rows."""
+        if self.cache_backend == 'parquet':
+            if not os.path.exists(self.parquet_path):
+                return None
+            import pyarrow.parquet as pq
+            span = (pq.read_schema(self.parquet_path).metadata or {}).get(COVERAGE_KEY)
+            return tuple(map(pd.Timestamp, span.decode().split(','))) if span else None
+        row = self._init_db().execute("SELECT start, end FROM cache_coverage WHERE ticker = ?",
+                                      (self.ticker,)).fetchone()
+        return (pd.Timestamp(row[0]), pd.Timestamp(row[1])) if row else None
+
+    def _save_to_cache(self, data: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        """
+        Store a downloaded range and mark [start, end) as covered, even when it came back empty
+        (before the listing date, after the last bar), so later runs do not request it again.
+        Coverage is recorded inclusive, like the cached dates it is combined with, and never
+        reaches today, since today's bar may still appear.
+        """
+        end = min(end, pd.Timestamp.today().normalize()) - pd.Timedelta(days=1)
+        coverage = self._coverage()
+        if coverage is not None:
+            start, end = min(start, coverage[0]), max(end, coverage[1])
+        if self.cache_backend == 'parquet':
+            self._save_to_parquet(data, (start, end))
+            return
         conn = self._init_db()
-        cached = self._load_from_db(conn)
-        
-        if cached is not None:
-            conn.close()
-            return cached
-            
-        try:
-            # Download data from Yahoo Finance
-            data = yf.download(self.ticker, start=self.start_date, end=self.end_date)
-            
-            # Convert column names to lowercase strings
-            if isinstance(data.columns, pd.MultiIndex):
-                # Handle MultiIndex columns
-                data.columns = [str(col[0]).lower() for col in data.columns]
-            else:
-                # Handle regular Index columns
-                data.columns = [str(col).lower() for col in data.columns]
-            
-            # Save to database
-            self._save_to_db(data, conn)
-            conn.close()
-            return data
-            
-        except Exception as e:
-            conn.close()
-            raise Exception(f"Error downloading data for {self.ticker}: {str(e)}")
\ No newline at end of file
+        with _DB_WRITE_LOCK:
+            if not data.empty:
+                self._save_to_db(data, conn)
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO cache_coverage (ticker, start, end) VALUES (?, ?, ?)",
+                             (self.ticker, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')))
+
+    def _cached_range(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return the first and last dates the cache answers for, or None if nothing is cached."""
+        cached = None
+        if self.cache_backend == 'parquet':
+            if os.path.exists(self.parquet_path):
+                index = pd.read_parquet(self.parquet_path, columns=['close']).index
+                cached = (index.min(), index.max()) if len(index) else None
+        else:
+            conn = self._init_db()
+            first, last = conn.execute(f'SELECT MIN(date), MAX(date) FROM "{self.table_name}"').fetchone()
+            cached = (pd.Timestamp(first), pd.Timestamp(last)) if first is not None else None
+        coverage = self._coverage()
+        if cached is None or coverage is None:
+            return cached or coverage
+        return min(cached[0], coverage[0]), max(cached[1], coverage[1])
+
+    def _missing_ranges(self) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return the head/tail [start, end) ranges of the request that are not cached yet."""
+        start, end = pd.Timestamp(self.start_date), pd.Timestamp(self.end_date)
+        cached = self._cached_range()
+        if cached is None:
+            return [(start, end)]
+        first, last = cached
+        missing = []
+        if first - start > CACHE_GAP_TOLERANCE:
+            missing.append((start, first))
+        if end - last > CACHE_GAP_TOLERANCE:
+            missing.append((last + pd.Timedelta(days=1), end))
+        return missing
+
+    def _download(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        # yfinance is slow to import, so only load it once a download is actually needed
+        import yfinance as yf
+        # Download data from Yahoo Finance; flat, column-grouped output needs no MultiIndex flattening
+        data = yf.download(self.ticker, start=start.strftime('%Y-%m-%d'), end=end.strftime('%Y-%m-%d'),
+                           auto_adjust=True, group_by='column', multi_level_index=False,
+                           progress=False, threads=False)
+        data.columns = data.columns.str.lower()
+        return data
+
+    def load_data(self) -> pd.DataFrame:
+        # Only fetch the parts of the requested range the cache does not cover yet
+        for start, end in self._missing_ranges():
+            try:
+                data = self._download(start, end)
+            except Exception as e:
+                # A failed top-up is not fatal when the cache already holds rows for the request
+                if self._load_from_cache() is None:
+                    raise Exception(f"Error downloading data for {self.ticker}: {str(e)}")
+                logger.warning(f"Could not download {self.ticker} from {start:%Y-%m-%d} to {end:%Y-%m-%d}, "
+                               f"using cached rows only: {e}")
+                continue
+            self._save_to_cache(data, start, end)
+
+        cached = self._load_from_cache()
+        if cached is None:
+            cached = pd.DataFrame(columns=OHLCV_COLUMNS)
+        return self._to_float64_block(cached)
@@ -0,0 +1,65 @@
+# src/core/panel.py
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+@dataclass
+class PricePanel:
+    """
+    Closes of several symbols on one shared timeline, stored symbol-major: close[s] is the
+    contiguous price history of symbols[s], and returns[s] its simple returns (NaN on the first bar).
+    """
+    symbols: List[str]
+    timestamps: np.ndarray
+    close: np.ndarray
+    returns: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.close = np.ascontiguousarray(np.atleast_2d(self.close), dtype=np.float64)
+        if self.close.shape != (len(self.symbols), len(self.timestamps)):
+            raise ValueError(f"close has shape {self.close.shape}, expected "
+                             f"({len(self.symbols)}, {len(self.timestamps)}) for symbols x timestamps.")
+        self.returns = np.empty_like(self.close)
+        self.returns[:, :1] = np.nan
+        np.divide(self.close[:, 1:], self.close[:, :-1], out=self.returns[:, 1:])
+        self.returns[:, 1:] -= 1.0
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> 'PricePanel':
+        """
+        Align the close columns of per-symbol OHLCV frames on their common dates. Gaps are
+        forward-filled and leading rows without a price for every symbol are dropped, so the panel is gap-free.
+        """
+        closes = pd.concat({symbol: frame['close'] for symbol, frame in frames.items()}, axis=1, join='inner')
+        closes = closes.ffill().dropna()
+        return cls(symbols=list(closes.columns),
+                   timestamps=closes.index.to_numpy(),
+                   close=closes.to_numpy(dtype=np.float64, na_value=np.nan).T)
+
+    def index_of(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def pair_frame(self, symbol: str, benchmark: str) -> pd.DataFrame:
+        """Single-pair frame with the 'close' and 'benchmark_close' columns the strategies read."""
+        return pd.DataFrame({'close': self.close[self.index_of(symbol)],
+                             'benchmark_close': self.close[self.index_of(benchmark)]},
+                            index=pd.DatetimeIndex(self.timestamps))
+
+    def pair_matrices(self, pairs: Sequence[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """(n_pairs, T) price and benchmark matrices for StatisticalArbitrageStrategy.batch_generate_signals."""
+        rows = np.array([self.index_of(symbol) for symbol, _ in pairs], dtype=np.intp)
+        bench_rows = np.array([self.index_of(benchmark) for _, benchmark in pairs], dtype=np.intp)
+        return self.close[rows], self.close[bench_rows]
+
+    def hedge_ratios(self) -> np.ndarray:
+        """
+        OLS slope of every symbol's price on every other's over the whole panel: entry [i, j] regresses
+        symbols[i] on symbols[j]. All S x S covariances come from one matrix product on the centred prices.
+        """
+        centred = self.close - self.close.mean(axis=1, keepdims=True)
+        cov = centred @ centred.T
+        var = np.diag(cov)
+        # Constant series get slope 0, as in the single-pair fit
+        return np.divide(cov, var[None, :], out=np.zeros_like(cov), where=var[None, :] > 0)
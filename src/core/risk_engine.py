@@ -2,11 +2,13 @@
 
 import numpy as np
 import pandas as pd
-from scipy import stats
 from typing import Dict
-import warnings
+from src.core._kernels import (as_f64, drawdown_stats, norm_ppf, fit_genpareto_mom,
+                               fit_genpareto_pwm, genpareto_ppf)
 
 class RiskEngine:
+    __slots__ = ('data',)
+
     def __init__(self, data: pd.DataFrame):
         self.data = data
 
@@ -15,7 +17,8 @@ class RiskEngine:
         Calculate tail risk metrics (VaR, CVaR, EVT VaR) with robust handling of edge cases.
         If strategy returns are constant (or nearly so), the metrics will naturally be near zero.
         """
-        returns = self.data['strategy_returns'].dropna()
+        returns = as_f64(self.data['strategy_returns'])
+        returns = returns[~np.isnan(returns)]
 
         # Not enough data points to compute risk metrics
         if len(returns) < 2:
@@ -26,19 +29,22 @@ class RiskEngine:
                 'evt_var': 0.0
             }
 
-        # Historical VaR based on empirical distribution
-        hist_var = np.percentile(returns, (1 - confidence_level) * 100)
+        # Historical VaR based on empirical distribution; selecting the two order statistics around
+        # the quantile is O(n), and interpolating between them matches np.percentile's linear method
+        position = (1 - confidence_level) * (len(returns) - 1)
+        k = int(np.floor(position))
+        upper = min(k + 1, len(returns) - 1)
+        part = np.partition(returns, [k, upper])
+        hist_var = part[k] + (position - k) * (part[upper] - part[k])
 
         # Calculate parametric VaR only if standard deviation is not near zero
-        std = returns.std()
+        std = returns.std(ddof=1)
         if np.isclose(std, 0):
             param_var = hist_var
         else:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                param_var = stats.norm.ppf(1 - confidence_level, loc=returns.mean(), scale=std)
-                if np.isnan(param_var):
-                    param_var = hist_var
+            param_var = returns.mean() + std * norm_ppf(1 - confidence_level)
+            if np.isnan(param_var):
+                param_var = hist_var
 
         # Calculate Conditional VaR (Expected Shortfall)
         cvar_returns = returns[returns <= hist_var]
@@ -47,10 +53,15 @@ class RiskEngine:
         # Calculate EVT VaR if there are enough negative return observations
         negative_returns = -returns[returns < 0]
         if len(negative_returns) > 10:
-            try:
-                evt_params = stats.genpareto.fit(negative_returns)
-                evt_var = -stats.genpareto.ppf(1 - confidence_level, *evt_params)
-            except Exception:
+            # Closed-form PWM fit of the loss tail, then plain moments if the PWM fit degenerates;
+            # only when both do does EVT VaR fall back to historical VaR
+            evt_var = np.nan
+            for fit in (fit_genpareto_pwm, fit_genpareto_mom):
+                shape, scale = fit(negative_returns)
+                evt_var = -genpareto_ppf(1 - confidence_level, shape, scale)
+                if np.isfinite(evt_var):
+                    break
+            else:
                 evt_var = hist_var
         else:
             evt_var = hist_var
@@ -77,16 +88,21 @@ class RiskEngine:
         if len(common_idx) < 2:
             return {'factor_betas': {}, 'r_squared': 0.0}
 
-        y = strategy_returns.loc[common_idx]
-        X = factor_returns.loc[common_idx]
+        y = as_f64(strategy_returns.loc[common_idx])
+        factors = factor_returns.loc[common_idx].to_numpy(dtype=np.float64)
 
-        # Add an intercept term
-        X = pd.concat([pd.Series(1, index=X.index, name='intercept'), X], axis=1)
+        # Design matrix with a leading intercept column
+        X = np.empty((len(common_idx), factors.shape[1] + 1))
+        X[:, 0] = 1.0
+        X[:, 1:] = factors
 
         try:
-            betas = np.linalg.pinv(X.T @ X) @ X.T @ y
-            y_pred = X @ betas
-            r_squared = max(0, 1 - np.sum((y - y_pred) ** 2) / np.sum((y - y.mean()) ** 2))
+            # Least squares on X itself rather than the normal equations, which square its
+            # condition number; collinear factors get the minimum-norm solution
+            betas = np.linalg.lstsq(X, y, rcond=None)[0]
+            resid = y - X @ betas
+            centered = y - y.mean()
+            r_squared = max(0, 1 - np.dot(resid, resid) / np.dot(centered, centered))
         except Exception:
             return {'factor_betas': {}, 'r_squared': 0.0}
 
@@ -110,28 +126,10 @@ class RiskEngine:
                 'drawdown_frequency': 0.0
             }
 
-        # Compute running maximum using cummax for robustness
-        running_max = equity_curve.cummax()
-        drawdowns = (equity_curve - running_max) / running_max
-
-        max_drawdown = drawdowns.min()
-        avg_drawdown = drawdowns[drawdowns < 0].mean() if (drawdowns < 0).any() else 0.0
-
-        # Determine drawdown recovery times by detecting changes in drawdown state
-        is_drawdown = drawdowns < 0
-        drawdown_periods = is_drawdown.astype(int).diff()
-        recovery_times = []
-        current_drawdown_start = None
-
-        for date, change in drawdown_periods.items():
-            if change == 1:  # Start of a drawdown period
-                current_drawdown_start = date
-            elif change == -1 and current_drawdown_start is not None:  # End of a drawdown period
-                recovery_times.append((date - current_drawdown_start).days)
-                current_drawdown_start = None
-
-        avg_recovery_time = np.mean(recovery_times) if recovery_times else 0.0
-        drawdown_frequency = len(recovery_times) / len(equity_curve) if len(equity_curve) > 0 else 0.0
+        # Running peak, drawdowns, their transitions and recovery times in one compiled pass
+        ts_ns = pd.DatetimeIndex(equity_curve.index).as_unit('ns').asi8
+        max_drawdown, avg_drawdown, avg_recovery_time, recoveries = drawdown_stats(as_f64(equity_curve), ts_ns)
+        drawdown_frequency = recoveries / len(equity_curve)
 
         return {
             'max_drawdown': max_drawdown,
@@ -1,10 +1,18 @@
 import numpy as np
 import pandas as pd
+import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
+from tensorflow.keras import mixed_precision
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Input, LSTM, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
 from sklearn.preprocessing import MinMaxScaler
 
+# Float16 compute only pays off on GPU tensor cores; on CPU it is slower than float32
+_HAS_GPU = bool(tf.config.list_physical_devices('GPU'))
+if _HAS_GPU:
+    mixed_precision.set_global_policy('mixed_float16')
+
 class RegimeDetector:
     def __init__(self, lookback_window=30, hidden_units=50, epochs=10, batch_size=32):
         self.lookback_window = lookback_window
@@ -12,38 +20,83 @@ class RegimeDetector:
         self.epochs = epochs
         self.batch_size = batch_size
         self.model = None
+        self._infer = None
+        # TFLite interpreter with int8 weights, set by quantize()
+        self._interpreter = None
         self.scaler = MinMaxScaler(feature_range=(0, 1))
 
     def prepare_data(self, series: pd.Series):
-        data = series.values.reshape(-1, 1)
-        scaled_data = self.scaler.fit_transform(data)
-        X, y = [], []
-        for i in range(self.lookback_window, len(scaled_data)):
-            X.append(scaled_data[i - self.lookback_window:i, 0])
-            y.append(scaled_data[i, 0])
-        X, y = np.array(X), np.array(y)
-        X = np.reshape(X, (X.shape[0], X.shape[1], 1))
+        data = series.to_numpy(dtype=np.float64).reshape(-1, 1)
+        scaled_data = self.scaler.fit_transform(data).ravel()
+        # Window i covers the lookback values before target i: one strided view, one contiguous copy
+        X = sliding_window_view(scaled_data[:-1], self.lookback_window)[:, :, None].copy()
+        y = scaled_data[self.lookback_window:]
         return X, y
 
-    def build_model(self, input_shape):
-        model = Sequential([
-            Input(shape=input_shape),
+    def _network(self, input_shape, batch_size=None):
+        return Sequential([
+            Input(shape=input_shape, batch_size=batch_size),
             LSTM(units=self.hidden_units, return_sequences=True),
             Dropout(0.2),
             LSTM(units=self.hidden_units),
             Dropout(0.2),
-            Dense(1)
+            # Keep the output layer in float32 so predictions are not rounded to half precision
+            Dense(1, dtype='float32')
         ])
+
+    def build_model(self, input_shape):
+        model = self._network(input_shape)
         model.compile(optimizer=Adam(learning_rate=0.001), loss='mean_squared_error')
         self.model = model
+        # Call the model as a traced graph instead of going through Model.predict's per-call setup;
+        # on CPU, XLA fuses the LSTM cell ops
+        self._infer = tf.function(
+            lambda X: model(X, training=False),
+            input_signature=[tf.TensorSpec([None, *input_shape], tf.float32)],
+            jit_compile=not _HAS_GPU)
+        self._interpreter = None
 
     def train(self, series: pd.Series):
         X, y = self.prepare_data(series)
         self.build_model((X.shape[1], 1))
         self.model.fit(X, y, epochs=self.epochs, batch_size=self.batch_size, verbose=1)
 
+    def quantize(self):
+        """
+        Convert the trained model to a TFLite graph with int8 weights (dynamic-range quantization);
+        activations stay float. Later predict calls run on that interpreter: a smaller model, at the cost
+        of int8 rounding in the weights. Calibrated full-integer conversion is not used, since TFLite's
+        calibrator cannot run the LSTM.
+        """
+        # The LSTM only lowers to TFLite with a static batch dimension, and XNNPack cannot resize it
+        # afterwards, so convert a fixed-batch copy and feed it batch_size windows at a time
+        fixed = self._network(self.model.input_shape[1:], batch_size=self.batch_size)
+        fixed.set_weights(self.model.get_weights())
+        converter = tf.lite.TFLiteConverter.from_keras_model(fixed)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        self._interpreter = tf.lite.Interpreter(model_content=converter.convert())
+        self._interpreter.allocate_tensors()
+
+    def _predict_quantized(self, X: np.ndarray) -> np.ndarray:
+        interpreter = self._interpreter
+        input_index = interpreter.get_input_details()[0]['index']
+        output_index = interpreter.get_output_details()[0]['index']
+        # Pad the last chunk to a full batch and drop its padded rows afterwards
+        n_chunks = -(-len(X) // self.batch_size)
+        padded = np.zeros((n_chunks * self.batch_size, *X.shape[1:]), dtype=np.float32)
+        padded[:len(X)] = X
+        predictions = np.empty((len(padded), 1), dtype=np.float32)
+        for start in range(0, len(padded), self.batch_size):
+            interpreter.set_tensor(input_index, padded[start:start + self.batch_size])
+            interpreter.invoke()
+            predictions[start:start + self.batch_size] = interpreter.get_tensor(output_index)
+        return predictions[:len(X)]
+
     def predict(self, series: pd.Series):
         X, _ = self.prepare_data(series)
-        predictions = self.model.predict(X)
+        if self._interpreter is not None:
+            predictions = self._predict_quantized(X)
+        else:
+            predictions = self._infer(tf.constant(X, dtype=tf.float32)).numpy()
         predictions = self.scaler.inverse_transform(predictions)
         return predictions
\ No newline at end of file
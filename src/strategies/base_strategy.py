@@ -1,9 +1,28 @@
 # src/strategies/base_strategy.py
 from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
 import pandas as pd
 
 class BaseStrategy(ABC):
+    # Subclasses declare their parameters in __slots__, so instances carry no per-object __dict__
+    __slots__ = ()
+
     @abstractmethod
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """Compute trading signals from market data."""
-        pass
\ No newline at end of file
+        pass
+
+    def prepare(self, data: pd.DataFrame) -> None:
+        """
+        Optional hook the backtesting engine runs in the parent process before generating signals in
+        worker processes. Strategies warm caches here that would otherwise die with the workers.
+        """
+        return None
+
+    def vectorized_signal(self, close: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Optional fast path computing the same signals from a float64 close array with raw NumPy.
+        Strategies that need more than the close prices return None and use generate_signals.
+        """
+        return None
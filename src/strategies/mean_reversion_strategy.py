@@ -1,20 +1,24 @@
 # src/strategies/mean_reversion_strategy.py
 
+import numpy as np
 import pandas as pd
+from src.core._kernels import as_f64, rolling_mean
 from .base_strategy import BaseStrategy
 
 class MeanReversionStrategy(BaseStrategy):
+    __slots__ = ('window', 'threshold')
+
     def __init__(self, window: int = 20, threshold: float = 0.05):
         self.window = window
         self.threshold = threshold
 
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
-        # Use the lower-case 'close' column
-        price = data['close']
-        rolling_mean = price.rolling(window=self.window).mean()
-        # Signal: +1 when price is significantly below mean (buy), -1 when above (sell)
-        buy_signal = (price < rolling_mean * (1 - self.threshold)).astype(int)
-        sell_signal = (price > rolling_mean * (1 + self.threshold)).astype(int)
-        # Combine signals: buy=+1, sell=-1, otherwise 0.
-        signals = buy_signal - sell_signal
-        return signals
\ No newline at end of file
+        # Use the lower-case 'close' column as float64 NumPy values (Arrow-backed columns propagate NA)
+        return pd.Series(self.vectorized_signal(as_f64(data['close'])), index=data.index)
+
+    def vectorized_signal(self, close: np.ndarray) -> np.ndarray:
+        rmean = rolling_mean(close, self.window)
+        # Signal: +1 when price is significantly below mean (buy), -1 when above (sell), in one pass;
+        # the NaN warm-up of the rolling mean compares False and stays flat
+        return np.where(close < rmean * (1 - self.threshold), np.int8(1),
+                        np.where(close > rmean * (1 + self.threshold), np.int8(-1), np.int8(0)))
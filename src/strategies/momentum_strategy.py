@@ -1,15 +1,25 @@
 # src/strategies/momentum_strategy.py
 
+import numpy as np
 import pandas as pd
+from src.core._kernels import as_f64, rolling_mean
 from .base_strategy import BaseStrategy
 
 class MomentumStrategy(BaseStrategy):
+    __slots__ = ('window',)
+
     def __init__(self, window: int = 20):
         self.window = window
 
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         # Use the lower-case 'close' column (as ensured by the data provider)
-        close_col = 'close'
-        data['rolling_mean'] = data[close_col].rolling(window=self.window).mean()
-        signals = data[close_col] > data['rolling_mean']
-        return signals.astype(int).replace(0, -1)
\ No newline at end of file
+        close = as_f64(data['close'])
+        return pd.Series(self.vectorized_signal(close), index=data.index)
+
+    def vectorized_signal(self, close: np.ndarray) -> np.ndarray:
+        # Long above the rolling mean, short otherwise, in a single pass over the close prices
+        rmean = rolling_mean(close, self.window)
+        signals = np.where(close > rmean, np.int8(1), np.int8(-1))
+        # No position until the first full window is available
+        signals[:self.window - 1] = 0
+        return signals
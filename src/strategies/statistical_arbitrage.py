@@ -1,132 +1,236 @@
 # src/strategies/statistical_arbitrage.py
 
+import hashlib
 import numpy as np
 import pandas as pd
-from typing import Tuple
-from sklearn.linear_model import LinearRegression
-from statsmodels.tsa.stattools import adfuller
+from collections import OrderedDict
+from typing import Optional, Tuple
+from src.core._kernels import (adf_tstat, adf_tstat_lag, as_f64, enforce_hold, mackinnon_pvalue, ols1d,
+                               rolling_hedge_ratio, rolling_zscore)
 from .base_strategy import BaseStrategy
 
+# Cointegration fits remembered per strategy instance
+COINT_CACHE_SIZE = 128
+# ADF p-values shared by every instance in the process, keyed by a hash of the spread
+ADF_CACHE_SIZE = 256
+_ADF_CACHE: OrderedDict = OrderedDict()
+
+def _zero_signals(index: pd.Index) -> pd.Series:
+    """Flat int8 signals for the early exits, writable like the signals of a traded pair."""
+    return pd.Series(np.zeros(len(index), dtype=np.int8), index=index, copy=False)
+
 class StatisticalArbitrageStrategy(BaseStrategy):
+    __slots__ = ('lookback_period', 'entry_zscore', 'exit_zscore', 'max_position_hold',
+                 'min_half_life', 'confidence_level', 'adf_lag', '_coint_cache')
+
     def __init__(self,
                  lookback_period: int = 60,
                  entry_zscore: float = 2.0,
                  exit_zscore: float = 0.5,  # More conservative exits
                  max_position_hold: int = 20,
                  min_half_life: int = 5,     # Added half-life check
-                 confidence_level: float = 0.05):  # Confidence level for cointegration
+                 confidence_level: float = 0.05,  # Confidence level for cointegration
+                 adf_lag: Optional[int] = None):  # Fixed ADF lag; None selects it by AIC
         self.lookback_period = lookback_period
         self.entry_zscore = entry_zscore
         self.exit_zscore = exit_zscore
         self.max_position_hold = max_position_hold
         self.min_half_life = min_half_life
         self.confidence_level = confidence_level
+        self.adf_lag = adf_lag
+        # (p-value, slope, intercept, spread) keyed by a digest of the input pair
+        self._coint_cache: OrderedDict = OrderedDict()
         
     def calculate_half_life(self, spread: pd.Series) -> float:
         """Calculate the half-life of mean reversion."""
-        spread_lag = spread.shift(1)
-        spread_diff = spread - spread_lag
-        spread_lag = spread_lag.dropna()
-        spread_diff = spread_diff.dropna()
+        values = as_f64(spread)
+        spread_lag = values[:-1]
+        spread_diff = np.diff(values)
+        valid = np.isfinite(spread_lag) & np.isfinite(spread_diff)
         
-        model = LinearRegression()
-        model.fit(spread_lag.values.reshape(-1, 1), spread_diff.values.reshape(-1, 1))
-        
-        coef = model.coef_[0][0]
+        # Closed-form OLS slope of the spread change on the lagged spread
+        coef, _ = ols1d(spread_lag[valid], spread_diff[valid])
         half_life = -np.log(2) / coef if coef < 0 else np.inf
         return half_life
         
     def calculate_zscore(self, spread: pd.Series) -> pd.Series:
         """Calculate z-score of the spread with rolling window."""
-        mean = spread.rolling(window=self.lookback_period, min_periods=self.lookback_period // 2).mean()
-        std = spread.rolling(window=self.lookback_period, min_periods=self.lookback_period // 2).std()
-        std = std.replace(0, np.nan)  # Avoid division by zero
-        zscore = (spread - mean) / std
-        return zscore.fillna(0)
-        
-    def check_cointegration(self, series1: pd.Series, series2: pd.Series) -> bool:
-        """Test for cointegration using the ADF test."""
+        return pd.Series(self._zscore(as_f64(spread)), index=spread.index)
+        
+    def _zscore(self, values: np.ndarray) -> np.ndarray:
+        # Mean, std and the division fused in one pass; flat windows score 0 rather than dividing by zero
+        return rolling_zscore(values, self.lookback_period, self.lookback_period // 2)
+        
+    @staticmethod
+    def _adf_pvalue(spread: np.ndarray, lag: Optional[int] = None) -> float:
+        """
+        ADF p-value computed by the numba kernels and memoized. With no fixed lag, the lag is selected
+        by AIC up to (n - 1)^(1/3); a fixed lag skips that search and runs a single regression.
+        """
+        maxlag = int(np.power(len(spread) - 1, 1/3)) if lag is None else lag
+        if maxlag < 0 or maxlag > len(spread) // 2 - 2:
+            raise ValueError("sample size is too short for the ADF regression")
+        if spread.max() == spread.min():
+            raise ValueError("Invalid input, x is constant")
+        spread = as_f64(spread)
+        # Parameter sweeps build new instances over the same pair, so the test result outlives any one of
+        # them; the engine runs prepare() in its own process so this cache persists across run_all calls
+        key = (lag, hashlib.blake2b(spread.tobytes(), digest_size=16).digest())
+        p_value = _ADF_CACHE.get(key)
+        if p_value is not None:
+            _ADF_CACHE.move_to_end(key)
+            return p_value
+        stat = adf_tstat(spread, maxlag) if lag is None else adf_tstat_lag(spread, lag)
+        p_value = mackinnon_pvalue(stat)
+        _ADF_CACHE[key] = p_value
+        if len(_ADF_CACHE) > ADF_CACHE_SIZE:
+            _ADF_CACHE.popitem(last=False)
+        return p_value
+        
+    def check_cointegration(self, series1: pd.Series,
+                            series2: pd.Series) -> Tuple[bool, float, float, Optional[pd.Series]]:
+        """
+        Test for cointegration using the ADF test.
+        Returns the test outcome with the fitted slope, intercept and spread so callers can reuse the fit.
+        """
         if len(series1) != len(series2):
-            return False
+            return False, np.nan, np.nan, None
             
         valid_data = pd.concat([series1, series2], axis=1).dropna()
         if len(valid_data) < self.lookback_period:
-            return False
+            return False, np.nan, np.nan, None
             
-        model = LinearRegression()
-        X = valid_data.iloc[:, 1].values.reshape(-1, 1)
-        y = valid_data.iloc[:, 0].values.reshape(-1, 1)
-        model.fit(X, y)
-        spread = y.flatten() - model.coef_[0][0] * X.flatten() - model.intercept_[0]
+        X = as_f64(valid_data.iloc[:, 1])
+        y = as_f64(valid_data.iloc[:, 0])
+        # Rolling backtests re-test the same pair repeatedly; the cached spread is only reused for
+        # byte-identical prices and dates, so key on a digest of the full content
+        digest = hashlib.blake2b(X.tobytes(), digest_size=16)
+        digest.update(y.tobytes())
+        digest.update(pd.util.hash_pandas_object(valid_data.index, index=False).to_numpy().tobytes())
+        key = digest.digest()
+        cached = self._coint_cache.get(key)
+        if cached is not None:
+            self._coint_cache.move_to_end(key)
+            p_value, slope, intercept, spread = cached
+            return p_value < self.confidence_level, slope, intercept, spread
+            
+        slope, intercept = ols1d(X, y)
+        spread = y - slope * X - intercept
         
         try:
-            adf_result = adfuller(spread, maxlag=int(np.power(len(spread) - 1, 1/3)))
-            p_value = adf_result[1]
+            p_value = self._adf_pvalue(spread, self.adf_lag)
             # Debug print: check p-value from the cointegration test
             print("ADF p-value:", p_value)
-            return p_value < self.confidence_level
         except Exception as e:
             print("ADF test exception:", e)
-            return False
+            return False, slope, intercept, None
+        spread = pd.Series(spread, index=valid_data.index)
+        self._coint_cache[key] = (p_value, slope, intercept, spread)
+        if len(self._coint_cache) > COINT_CACHE_SIZE:
+            self._coint_cache.popitem(last=False)
+        return p_value < self.confidence_level, slope, intercept, spread
             
     def calculate_hedge_ratio(self, series1: pd.Series, series2: pd.Series) -> Tuple[float, float]:
         """Calculate the optimal hedge ratio using rolling regression."""
         window = min(self.lookback_period, len(series1) - 1)
-        hedge_ratios = []
-        
-        for i in range(window, len(series1)):
-            X = series2.iloc[i-window:i].values.reshape(-1, 1)
-            y = series1.iloc[i-window:i].values.reshape(-1, 1)
-            model = LinearRegression()
-            model.fit(X, y)
-            hedge_ratios.append(model.coef_[0][0])
-            
+        x = as_f64(series2)
+        y = as_f64(series1)
+        # Centre both series so the running sums below stay well conditioned
+        x_mean, y_mean = x.mean(), y.mean()
+        x = x - x_mean
+        y = y - y_mean
+        
+        # Rolling slopes over [i - window, i) for every i in [window, n), in one O(n) pass
+        hedge_ratios = rolling_hedge_ratio(x, y, window)
+        
+        # Intercept of the most recent window, back in the original price units
+        last = slice(len(x) - 1 - window, len(x) - 1)
+        intercept = (y[last].mean() + y_mean) - hedge_ratios[-1] * (x[last].mean() + x_mean)
         # Use median hedge ratio for stability
-        return np.median(hedge_ratios), model.intercept_[0]
+        return np.median(hedge_ratios), intercept
+        
+    def _pair_prices(self, data: pd.DataFrame) -> Optional[Tuple[pd.Series, pd.Series]]:
+        """The pair's close and benchmark close, or None if the data cannot be traded."""
+        if len(data) < self.lookback_period or 'benchmark_close' not in data:
+            return None
+        # Work on float64 NumPy values; Arrow-backed columns would propagate NA through comparisons
+        return (pd.Series(as_f64(data['close']), index=data.index),
+                pd.Series(as_f64(data['benchmark_close']), index=data.index))
+        
+    def prepare(self, data: pd.DataFrame) -> None:
+        """
+        Run the cointegration test in the calling process. The fit is carried into the worker with
+        the pickled instance, and the ADF result stays in the calling process's module cache for later
+        instances over the same pair.
+        """
+        prices = self._pair_prices(data)
+        if prices is not None:
+            self.check_cointegration(*prices)
         
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """Generate trading signals based on statistical arbitrage."""
-        if len(data) < self.lookback_period:
-            return pd.Series(0, index=data.index)
-            
-        price1 = data['close']
-        try:
-            price2 = data['benchmark_close']
-        except KeyError:
-            return pd.Series(0, index=data.index)
+        prices = self._pair_prices(data)
+        if prices is None:
+            return _zero_signals(data.index)
+        price1, price2 = prices
             
         # Check for cointegration and log the result for debugging
-        cointegration_result = self.check_cointegration(price1, price2)
+        cointegration_result, hedge_ratio, intercept, spread = self.check_cointegration(price1, price2)
         print("Cointegration Test Passed:", cointegration_result)
         if not cointegration_result:
-            return pd.Series(0, index=data.index)
+            return _zero_signals(data.index)
+            
+        # Reuse the cointegrating regression's spread rather than refitting a hedge ratio
+        spread = spread.reindex(data.index)
+        return pd.Series(self._signals_from_spread(as_f64(spread), debug=True), index=data.index)
+        
+    def batch_generate_signals(self, prices: np.ndarray, benchmarks: np.ndarray) -> np.ndarray:
+        """
+        Generate signals for many pairs at once from aligned, gap-free (n_pairs, T) price matrices.
+        Hedge ratios for all pairs come from one vectorized regression along the time axis.
+        """
+        y = as_f64(np.atleast_2d(prices))
+        x = as_f64(np.atleast_2d(benchmarks))
+        signals = np.zeros(y.shape, dtype=np.int8)
+        if y.shape[1] < self.lookback_period:
+            return signals
             
-        hedge_ratio, intercept = self.calculate_hedge_ratio(price1, price2)
-        spread = price1 - hedge_ratio * price2 - intercept
+        # Centred OLS of each price row on its benchmark row; the centred residual is the spread
+        x = x - x.mean(axis=1, keepdims=True)
+        y = y - y.mean(axis=1, keepdims=True)
+        sxx = np.einsum('ij,ij->i', x, x)
+        sxy = np.einsum('ij,ij->i', x, y)
+        slopes = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+        spreads = y - slopes[:, None] * x
+        
+        for i, spread in enumerate(spreads):
+            try:
+                cointegrated = self._adf_pvalue(spread, self.adf_lag) < self.confidence_level
+            except Exception:
+                cointegrated = False
+            if cointegrated:
+                signals[i] = self._signals_from_spread(spread)
+        return signals
         
-        # Calculate half-life and log the value
+    def _signals_from_spread(self, spread: np.ndarray, debug: bool = False) -> np.ndarray:
+        """Turn a cointegrated spread into held -1/0/1 signals, or zeros if it reverts too slowly."""
+        # Calculate half-life; the single-pair path logs the value for debugging
         half_life = self.calculate_half_life(spread)
-        print("Calculated Half-life:", half_life)
+        if debug:
+            print("Calculated Half-life:", half_life)
         if half_life < self.min_half_life or half_life == np.inf:
-            return pd.Series(0, index=data.index)
+            return np.zeros(len(spread), dtype=np.int8)
             
         # Calculate z-score of the spread
-        zscore = self.calculate_zscore(spread)
+        zscore = self._zscore(spread)
         
-        signals = pd.Series(0, index=data.index)
-        signals[zscore > self.entry_zscore] = -1  # Short when spread is too high
-        signals[zscore < -self.entry_zscore] = 1  # Long when spread is too low
+        # Long when spread is too low, short when it is too high, in one compare-and-blend pass
+        signals = np.where(zscore < -self.entry_zscore, np.int8(1),
+                           np.where(zscore > self.entry_zscore, np.int8(-1), np.int8(0)))
         
-        # Exit signals
-        signals[(zscore > -self.exit_zscore) & (zscore < self.exit_zscore)] = 0
+        # Exit signals only overlap the entry bands when the exit threshold is the wider one
+        if self.exit_zscore > self.entry_zscore:
+            signals[np.abs(zscore) < self.exit_zscore] = 0
         
         # Enforce maximum holding period
-        entry_points = signals.shift(1).fillna(0) != signals
-        last_entry = None
-        for i in range(len(signals)):
-            if entry_points.iloc[i]:
-                last_entry = i
-            elif last_entry is not None and i - last_entry >= self.max_position_hold:
-                signals.iloc[i] = 0
-                
-        return signals
\ No newline at end of file
+        return enforce_hold(signals, self.max_position_hold)
@@ -0,0 +1,18 @@
+# src/utils/_njit.py
+
+# numba is optional: without it the kernels run as plain Python/NumPy.
+try:
+    import numba
+
+    def njit(*args, **kwargs):
+        """numba.njit with on-disk caching on by default, so only the first run pays for compilation."""
+        kwargs.setdefault('cache', True)
+        if len(args) == 1 and callable(args[0]):
+            return numba.njit(**kwargs)(args[0])
+        return numba.njit(*args, **kwargs)
+except ImportError:
+    def njit(*args, **kwargs):
+        """Identity stand-in for numba.njit, usable bare or with arguments."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,88 @@
+# tests/test_backtesting_engine.py
+
+import numpy as np
+import pandas as pd
+import src.core.backtesting_engine as backtesting_engine
+from src.core.backtesting_engine import BacktestingEngine
+from src.strategies.mean_reversion_strategy import MeanReversionStrategy
+from src.strategies.momentum_strategy import MomentumStrategy
+from src.strategies.statistical_arbitrage import StatisticalArbitrageStrategy
+
+def _prices(n: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({'close': close}, index=pd.bdate_range('2020-01-01', periods=n))
+
+def test_result_frames_do_not_share_columns():
+    engine = BacktestingEngine([MomentumStrategy(window=10), MeanReversionStrategy(window=10)])
+    results = engine.run_all(_prices())
+    momentum, mean_reversion = results['MomentumStrategy'], results['MeanReversionStrategy']
+    # Without copy-on-write (pandas < 3) shared buffers would let an edit to one frame leak into the other
+    for column in momentum.columns:
+        assert not np.shares_memory(momentum[column].to_numpy(), mean_reversion[column].to_numpy()), column
+    expected = mean_reversion.copy()
+    momentum.loc[momentum.index[5]] = -1.0
+    pd.testing.assert_frame_equal(mean_reversion, expected)
+
+def test_signal_cache_reuses_and_evicts(monkeypatch):
+    monkeypatch.setattr(backtesting_engine, 'SIGNAL_CACHE_SIZE', 3)
+    data = _prices()
+    engine = BacktestingEngine([MomentumStrategy(window=10), MeanReversionStrategy(window=10)])
+    first = engine.run_all(data)
+    cached = dict(engine._signal_cache)
+    # Same parameters and data: served from the cache with identical results
+    second = engine.run_all(data.copy())
+    assert dict(engine._signal_cache) == cached
+    for name in first:
+        pd.testing.assert_frame_equal(first[name], second[name])
+    # A different parameter or different prices is a different key
+    engine.strategies = [MomentumStrategy(window=20), MomentumStrategy(window=10)]
+    engine.run_all(data)
+    assert len(engine._signal_cache) == 3
+    engine.strategies = [MomentumStrategy(window=10)]
+    changed = data.copy()
+    changed.iloc[-1, 0] += 1.0
+    results = engine.run_all(changed)
+    # Bounded: the least recently used entry (mean reversion) was evicted, and the run is still complete
+    assert len(engine._signal_cache) == 3
+    assert not any(key.startswith('MeanReversionStrategy') for key in engine._signal_cache)
+    assert list(results) == ['MomentumStrategy']
+
+def test_run_larger_than_the_cache(monkeypatch):
+    monkeypatch.setattr(backtesting_engine, 'SIGNAL_CACHE_SIZE', 1)
+    strategies = [MomentumStrategy(window=w) for w in (5, 10, 20)]
+    results = BacktestingEngine(strategies).run_all(_prices())
+    expected = BacktestingEngine([strategies[-1]]).run_all(_prices())
+    pd.testing.assert_frame_equal(results['MomentumStrategy'], expected['MomentumStrategy'])
+
+def _pandas_backtest(strategy, data: pd.DataFrame, capital: float) -> pd.DataFrame:
+    """The original one-strategy-at-a-time pandas backtest."""
+    df = pd.DataFrame(index=data.index)
+    df['signal'] = strategy.generate_signals(data).astype(float)
+    df['returns'] = data['close'].pct_change()
+    df['strategy_returns'] = df['signal'].shift(1) * df['returns']
+    df['cumulative_strategy'] = (1 + df['strategy_returns']).cumprod() * capital
+    df['cumulative_market'] = (1 + df['returns']).cumprod() * capital
+    return df
+
+def test_run_all_matches_per_strategy_pandas_backtests():
+    data = _prices(800, seed=1)
+    rng = np.random.default_rng(2)
+    # A benchmark cointegrated with the close through a slowly reverting AR(1) spread, so the stat-arb
+    # strategy passes both its ADF and half-life checks and trades
+    spread = np.zeros(800)
+    for t in range(1, 800):
+        spread[t] = 0.95 * spread[t - 1] + rng.normal()
+    data['benchmark_close'] = 0.5 * data['close'] + 10 + spread
+    strategies = [MomentumStrategy(window=10), MeanReversionStrategy(window=10, threshold=0.01),
+                  StatisticalArbitrageStrategy(lookback_period=30, entry_zscore=1.0)]
+    results = BacktestingEngine(strategies, initial_capital=50000.0).run_all(data)
+    assert list(results) == [type(strategy).__name__ for strategy in strategies]
+    for strategy in strategies:
+        expected = _pandas_backtest(strategy, data, 50000.0)
+        result = results[type(strategy).__name__]
+        assert result['signal'].abs().sum() > 0
+        # The first bar has no return; the fused kernel starts both curves at the initial capital there
+        expected.iloc[0, expected.columns.get_loc('cumulative_strategy')] = 50000.0
+        expected.iloc[0, expected.columns.get_loc('cumulative_market')] = 50000.0
+        pd.testing.assert_frame_equal(result, expected, rtol=1e-12, check_freq=False)
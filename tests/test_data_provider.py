@@ -0,0 +1,93 @@
+# tests/test_data_provider.py
+
+import pandas as pd
+import pytest
+from src.core.data_provider import YahooDataProvider
+
+class FakeYahoo:
+    """Patched over YahooDataProvider._download: business-day bars over [start, end), like yfinance."""
+    def __init__(self, listed: str = '2000-01-01'):
+        self.listed = pd.Timestamp(listed)
+        self.calls = []
+        self.offline = False
+
+    def __call__(self, start, end):
+        self.calls.append((f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}"))
+        if self.offline:
+            raise ConnectionError('offline')
+        dates = pd.bdate_range(max(start, self.listed), end - pd.Timedelta(days=1))
+        close = 100 + (dates - pd.Timestamp('2000-01-01')).days * 0.1
+        return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+                             'volume': 1e6}, index=dates)
+
+@pytest.fixture
+def fake_yahoo(monkeypatch):
+    fake = FakeYahoo()
+    monkeypatch.setattr(YahooDataProvider, '_download', fake)
+    return fake
+
+@pytest.fixture(params=['parquet', 'sqlite'])
+def make_provider(request, tmp_path):
+    def make(start, end, ticker='AAA'):
+        return YahooDataProvider(ticker, start, end, db_path=str(tmp_path / 'db' / 'market.db'),
+                                 cache_backend=request.param, cache_dir=str(tmp_path / 'cache'))
+    return make
+
+def test_end_date_is_exclusive_on_every_backend(fake_yahoo, make_provider):
+    make_provider('2024-01-02', '2024-07-01').load_data()
+    # Served from the cache, which holds rows on both sides of the end date
+    data = make_provider('2024-01-02', '2024-06-05').load_data()
+    assert fake_yahoo.calls == [('2024-01-02', '2024-07-01')]
+    assert data.index[0] == pd.Timestamp('2024-01-02')
+    assert data.index[-1] == pd.Timestamp('2024-06-04')
+    assert len(data) == len(pd.bdate_range('2024-01-02', '2024-06-04'))
+
+def test_top_up_fetches_from_the_previous_end_date(fake_yahoo, make_provider):
+    make_provider('2024-01-02', '2024-06-05').load_data()
+    data = make_provider('2024-01-02', '2024-07-01').load_data()
+    # 2024-06-05 was the exclusive end of the first request, so the top-up must start there
+    assert fake_yahoo.calls == [('2024-01-02', '2024-06-05'), ('2024-06-05', '2024-07-01')]
+    pd.testing.assert_index_equal(data.index, pd.bdate_range('2024-01-02', '2024-06-28'), check_names=False)
+
+def test_empty_ranges_are_not_requested_again(fake_yahoo, make_provider):
+    fake_yahoo.listed = pd.Timestamp('2015-06-01')
+    for _ in range(3):
+        data = make_provider('2010-01-01', '2020-01-01').load_data()
+    assert fake_yahoo.calls == [('2010-01-01', '2020-01-01')]
+    assert data.index[0] == pd.Timestamp('2015-06-01')
+
+def test_failed_top_up_falls_back_to_the_cache(fake_yahoo, make_provider):
+    cached = make_provider('2024-01-02', '2024-06-05').load_data()
+    fake_yahoo.offline = True
+    data = make_provider('2024-01-02', '2024-07-01').load_data()
+    pd.testing.assert_frame_equal(data, cached)
+    with pytest.raises(Exception, match='Error downloading data for BBB'):
+        make_provider('2024-01-02', '2024-07-01', ticker='BBB').load_data()
+
+def _sqlite_provider(tmp_path, ticker, start='2024-01-02', end='2024-03-01'):
+    return YahooDataProvider(ticker, start, end, db_path=str(tmp_path / 'db' / 'market.db'), cache_backend='sqlite')
+
+def test_sqlite_cache_keeps_one_table_per_ticker(fake_yahoo, tmp_path):
+    tickers = ['AAA', '^GSPC', 'BRK-B']
+    for ticker in tickers:
+        _sqlite_provider(tmp_path, ticker).load_data()
+    conn = _sqlite_provider(tmp_path, 'AAA')._init_db()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {_sqlite_provider(tmp_path, ticker).table_name for ticker in tickers} <= tables
+    # Each table holds its own ticker's bars once, not the rows of all three
+    for ticker in tickers:
+        count, = conn.execute(f'SELECT COUNT(*) FROM "{_sqlite_provider(tmp_path, ticker).table_name}"').fetchone()
+        assert count == len(pd.bdate_range('2024-01-02', '2024-02-29'))
+
+def test_bulk_insert_round_trips_and_never_replaces_rows(tmp_path):
+    provider = _sqlite_provider(tmp_path, 'AAA')
+    conn = provider._init_db()
+    dates = pd.bdate_range('2024-01-02', periods=30)
+    data = pd.DataFrame({'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': range(30), 'volume': 1e6},
+                        index=dates, dtype='float64')
+    provider._save_to_db(data, conn)
+    # Overlapping rows with different prices must not overwrite the cached ones
+    provider._save_to_db(data.iloc[20:] + 1000, conn)
+    provider._save_to_db(data.iloc[:0], conn)
+    loaded = provider._to_float64_block(provider._load_from_db(conn))
+    pd.testing.assert_frame_equal(loaded, data, check_names=False, check_freq=False)
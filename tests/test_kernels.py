@@ -0,0 +1,201 @@
+# tests/test_kernels.py
+
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from src.core._kernels import (adf_tstat, adf_tstat_lag, drawdown_stats, enforce_hold, fit_genpareto_mom,
+                               fit_genpareto_pwm, genpareto_ppf, mackinnon_pvalue, norm_ppf, rolling_corr, run_backtest,
+                               rolling_hedge_ratio, rolling_mean, rolling_zscore)
+
+def _series(kind: str, n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    if kind == 'random_walk':
+        return np.cumsum(rng.normal(size=n))
+    # AR(1) spread that reverts towards zero, the case the strategy trades
+    x = np.zeros(n)
+    for t in range(1, n):
+        x[t] = 0.9 * x[t - 1] + rng.normal()
+    return x
+
+@pytest.mark.filterwarnings('ignore::FutureWarning')
+@pytest.mark.parametrize('kind', ['random_walk', 'ar1'])
+@pytest.mark.parametrize('n', [60, 250, 1000])
+def test_adf_autolag_matches_statsmodels(kind, n):
+    adfuller = pytest.importorskip('statsmodels.tsa.stattools').adfuller
+    x = _series(kind, n, seed=n)
+    maxlag = int(np.power(n - 1, 1/3))
+    stat, pvalue = adfuller(x, maxlag=maxlag, autolag='AIC')[:2]
+    ours = adf_tstat(x, maxlag)
+    assert ours == pytest.approx(stat, rel=1e-10, abs=1e-10)
+    assert mackinnon_pvalue(ours) == pytest.approx(pvalue, rel=1e-10, abs=1e-12)
+
+@pytest.mark.filterwarnings('ignore::FutureWarning')
+@pytest.mark.parametrize('lag', [0, 1, 3])
+@pytest.mark.parametrize('kind', ['random_walk', 'ar1'])
+def test_adf_fixed_lag_matches_statsmodels(kind, lag):
+    adfuller = pytest.importorskip('statsmodels.tsa.stattools').adfuller
+    x = _series(kind, 500, seed=lag)
+    stat, pvalue = adfuller(x, maxlag=lag, autolag=None)[:2]
+    ours = adf_tstat_lag(x, lag)
+    assert ours == pytest.approx(stat, rel=1e-10, abs=1e-10)
+    assert mackinnon_pvalue(ours) == pytest.approx(pvalue, rel=1e-10, abs=1e-12)
+
+def test_mackinnon_pvalue_matches_statsmodels():
+    mackinnonp = pytest.importorskip('statsmodels.tsa.adfvalues').mackinnonp
+    for stat in np.r_[-25.0, np.linspace(-18.8, 2.7, 200), 3.0]:
+        assert mackinnon_pvalue(stat) == pytest.approx(mackinnonp(stat, regression='c', N=1), abs=1e-14)
+
+def _enforce_hold_loop(signals: np.ndarray, max_hold: int) -> np.ndarray:
+    """The original per-bar loop: entries are changes in the incoming signal, counted before flattening."""
+    signals = pd.Series(signals)
+    entry_points = signals.shift(1).fillna(0) != signals
+    out = signals.copy()
+    last_entry = None
+    for i in range(len(signals)):
+        if entry_points.iloc[i]:
+            last_entry = i
+        elif last_entry is not None and i - last_entry >= max_hold:
+            out.iloc[i] = 0
+    return out.to_numpy()
+
+@pytest.mark.parametrize('max_hold', [0, 1, 3, 20])
+def test_enforce_hold_matches_loop(max_hold):
+    rng = np.random.default_rng(max_hold)
+    for _ in range(50):
+        n = int(rng.integers(0, 60))
+        runs = rng.choice(np.array([-1, 0, 1], dtype=np.int8), n, p=[0.2, 0.6, 0.2])
+        signals = np.repeat(runs, rng.integers(1, 30, n)).astype(np.int8)
+        np.testing.assert_array_equal(enforce_hold(signals, max_hold), _enforce_hold_loop(signals, max_hold))
+
+def test_norm_ppf_matches_scipy():
+    stats = pytest.importorskip('scipy.stats')
+    for p in [1e-300, 1e-10, 0.001, 0.02, 0.02425, 0.05, 0.3, 0.5, 0.9, 0.975, 0.99999]:
+        assert norm_ppf(p) == pytest.approx(stats.norm.ppf(p), rel=1e-12, abs=1e-12)
+    assert norm_ppf(0.0) == -np.inf
+    assert norm_ppf(1.0) == np.inf
+
+@pytest.mark.parametrize('shape', [-0.2, 0.0, 0.2])
+def test_genpareto_fits_recover_parameters(shape):
+    rng = np.random.default_rng(7)
+    scale = 0.01
+    u = rng.random(200000)
+    # Inverse-CDF draws, which also exercises genpareto_ppf
+    x = np.array([genpareto_ppf(q, shape, scale) for q in u])
+    for fit in (fit_genpareto_pwm, fit_genpareto_mom):
+        fitted_shape, fitted_scale = fit(x)
+        assert fitted_shape == pytest.approx(shape, abs=0.03)
+        assert fitted_scale == pytest.approx(scale, rel=0.03)
+
+def test_genpareto_fits_degenerate_input():
+    for fit in (fit_genpareto_pwm, fit_genpareto_mom):
+        assert np.isnan(fit(np.array([0.01]))).all()
+    assert np.isnan(fit_genpareto_pwm(np.full(20, 0.01))).all()
+    assert np.isnan(fit_genpareto_mom(-np.linspace(0.01, 0.1, 20))).all()
+
+def test_genpareto_ppf_matches_scipy():
+    stats = pytest.importorskip('scipy.stats')
+    for shape in (-0.3, 0.0, 1e-14, 0.4):
+        for q in (0.01, 0.05, 0.5, 0.95):
+            assert genpareto_ppf(q, shape, 0.02) == pytest.approx(stats.genpareto.ppf(q, shape, scale=0.02),
+                                                                   rel=1e-9)
+
+@pytest.mark.parametrize('window', [10, 60])
+def test_rolling_zscore_matches_pandas(window):
+    rng = np.random.default_rng(window)
+    x = np.cumsum(rng.normal(size=1500))
+    x[[0, 5, 300, 301, 900]] = np.nan
+    spread = pd.Series(x)
+    min_periods = window // 2
+    # The original pandas formula the kernel replaces
+    mean = spread.rolling(window=window, min_periods=min_periods).mean()
+    std = spread.rolling(window=window, min_periods=min_periods).std().replace(0, np.nan)
+    expected = ((spread - mean) / std).fillna(0).to_numpy()
+    np.testing.assert_allclose(rolling_zscore(x, window, min_periods), expected, rtol=1e-8, atol=1e-8)
+
+def test_rolling_zscore_flat_window_is_zero():
+    x = np.r_[np.arange(10.0), np.full(20, 3.0)]
+    z = rolling_zscore(x, 10, 5)
+    assert (z[20:] == 0.0).all()
+
+def test_drawdown_stats_hand_computed():
+    values = np.array([100.0, 110.0, 99.0, 88.0, 110.0, 121.0, 120.0])
+    ts_ns = pd.date_range('2020-01-01', periods=len(values), freq='D').as_unit('ns').asi8
+    max_dd, avg_dd, avg_recovery, recoveries = drawdown_stats(values, ts_ns)
+    assert max_dd == pytest.approx(-0.2)
+    # Drawdowns of -0.1, -0.2 and the still-open -1/121
+    assert avg_dd == pytest.approx((-0.1 - 0.2 - 1 / 121) / 3)
+    # One closed drawdown, from the 3rd to the 5th bar
+    assert recoveries == 1
+    assert avg_recovery == 2.0
+
+def test_ols_qr_compiles_without_performance_warnings():
+    numba = pytest.importorskip('numba')
+    from src.core._kernels import _ols_qr
+    y, X = np.ones(20), np.random.default_rng(0).normal(size=(20, 3))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', numba.NumbaPerformanceWarning)
+        # Compile a fresh dispatcher rather than loading the on-disk cache, which skips typing
+        beta, _, _ = numba.njit(_ols_qr.py_func)(y, X)
+    np.testing.assert_allclose(beta, np.linalg.lstsq(X, y, rcond=None)[0])
+
+@pytest.mark.parametrize('window', [5, 60])
+def test_rolling_corr_matches_pandas(window):
+    rng = np.random.default_rng(window)
+    x = 100 * np.cumprod(1 + rng.normal(0, 0.01, 1000))
+    y = 0.5 * x + 50 * np.cumprod(1 + rng.normal(0, 0.01, 1000))
+    # Returns, as plotted, with the leading NaN and a few gaps
+    x = np.r_[np.nan, x[1:] / x[:-1] - 1]
+    y = np.r_[np.nan, y[1:] / y[:-1] - 1]
+    x[[100, 500]] = np.nan
+    y[[101, 700]] = np.nan
+    expected = pd.Series(x).rolling(window=window).corr(pd.Series(y)).to_numpy()
+    np.testing.assert_allclose(rolling_corr(x, y, window), expected, rtol=1e-8, atol=1e-10)
+
+@pytest.mark.parametrize('window', [1, 20])
+def test_rolling_mean_matches_pandas(window):
+    x = 100 + np.cumsum(np.random.default_rng(window).normal(size=800))
+    x[[0, 300, 301, 650]] = np.nan
+    expected = pd.Series(x).rolling(window=window).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean(x, window), expected, rtol=1e-10)
+
+@pytest.mark.parametrize('window', [10, 60])
+def test_rolling_hedge_ratio_matches_per_window_fits(window):
+    rng = np.random.default_rng(window)
+    x = np.cumsum(rng.normal(size=400))
+    y = 1.5 * x + rng.normal(size=400)
+    x, y = x - x.mean(), y - y.mean()
+    # The per-window regressions the kernel replaces, over [i - window, i)
+    expected = [np.polyfit(x[i - window:i], y[i - window:i], 1)[0] for i in range(window, len(x))]
+    np.testing.assert_allclose(rolling_hedge_ratio(x, y, window), expected, rtol=1e-8, atol=1e-10)
+
+def test_rolling_hedge_ratio_flat_window_is_zero():
+    x = np.r_[np.zeros(10), np.arange(10.0)]
+    ratios = rolling_hedge_ratio(x, 2 * x, 5)
+    assert (ratios[:6] == 0.0).all()
+    np.testing.assert_allclose(ratios[10:], 2.0)
+
+def test_run_backtest_matches_pandas_shift_and_cumprod():
+    rng = np.random.default_rng(0)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, 500))
+    close[[200, 350]] = np.nan
+    signals = rng.choice(np.array([-1.0, 0.0, 1.0]), size=(500, 3))
+    capital = 100000.0
+    returns, strat_ret, cum_strategy, cum_market = run_backtest(close, signals, capital)
+
+    # The original per-strategy pandas backtest
+    market = pd.Series(close).pct_change(fill_method=None)
+    np.testing.assert_allclose(returns, market, rtol=1e-12, equal_nan=True)
+    # cumprod leaves NaN where a return is missing; the kernel carries the equity forward there instead
+    expected_market = ((1 + market).cumprod() * capital).ffill().fillna(capital)
+    np.testing.assert_allclose(cum_market, expected_market, rtol=1e-12)
+    for j in range(signals.shape[1]):
+        expected_ret = pd.Series(signals[:, j]).shift(1) * market
+        np.testing.assert_allclose(strat_ret[:, j], expected_ret, rtol=1e-12, equal_nan=True)
+        expected_equity = ((1 + expected_ret).cumprod() * capital).ffill().fillna(capital)
+        np.testing.assert_allclose(cum_strategy[:, j], expected_equity, rtol=1e-12)
+
+def test_run_backtest_empty():
+    returns, strat_ret, cum_strategy, cum_market = run_backtest(np.empty(0), np.empty((0, 2)), 1.0)
+    assert returns.shape == cum_market.shape == (0,)
+    assert strat_ret.shape == cum_strategy.shape == (0, 2)
@@ -0,0 +1,50 @@
+# tests/test_panel.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.panel import PricePanel
+
+def _frames():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-01', periods=300, freq='B')
+    stock = pd.DataFrame({'open': 1.0, 'close': 100 + np.cumsum(rng.normal(size=300)), 'volume': 1e6},
+                         index=dates)
+    # The benchmark starts later, misses some of the stock's dates and has gaps in its closes
+    benchmark = pd.DataFrame({'close': 50 + np.cumsum(rng.normal(size=300))}, index=dates).iloc[5:]
+    benchmark = benchmark.drop(dates[[40, 41, 200]])
+    benchmark.iloc[[0, 1, 100, 101]] = np.nan
+    return stock, benchmark
+
+def test_pair_frame_matches_join_alignment():
+    stock, benchmark = _frames()
+    # The join main_backtest did before aligning through the panel
+    expected = stock.join(benchmark[['close']].rename(columns={'close': 'benchmark_close'}), how='inner')
+    expected['benchmark_close'] = expected['benchmark_close'].ffill()
+    expected = expected.dropna(subset=['benchmark_close'])
+
+    pair = PricePanel.from_frames({'A': stock, 'B': benchmark}).pair_frame('A', 'B')
+    assert list(pair.columns) == ['close', 'benchmark_close']
+    pd.testing.assert_index_equal(pair.index, expected.index, check_names=False)
+    pd.testing.assert_frame_equal(pair, expected[['close', 'benchmark_close']], check_names=False,
+                                  check_freq=False)
+
+def test_returns_and_pair_matrices():
+    stock, benchmark = _frames()
+    panel = PricePanel.from_frames({'A': stock, 'B': benchmark})
+    assert np.isnan(panel.returns[:, 0]).all()
+    np.testing.assert_allclose(panel.returns[:, 1:], panel.close[:, 1:] / panel.close[:, :-1] - 1)
+    prices, benchmarks = panel.pair_matrices([('A', 'B'), ('B', 'A')])
+    np.testing.assert_array_equal(prices, panel.close)
+    np.testing.assert_array_equal(benchmarks, panel.close[::-1])
+
+def test_hedge_ratios_match_polyfit():
+    stock, benchmark = _frames()
+    panel = PricePanel.from_frames({'A': stock, 'B': benchmark})
+    ratios = panel.hedge_ratios()
+    assert ratios[0, 1] == pytest.approx(np.polyfit(panel.close[1], panel.close[0], 1)[0])
+    assert ratios[1, 0] == pytest.approx(np.polyfit(panel.close[0], panel.close[1], 1)[0])
+
+def test_shape_mismatch_raises():
+    with pytest.raises(ValueError):
+        PricePanel(symbols=['A', 'B'], timestamps=np.arange(3), close=np.zeros((2, 4)))
@@ -0,0 +1,39 @@
+# tests/test_regime_detector.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+pytest.importorskip('sklearn')
+from src.ml.regime_detector import RegimeDetector
+
+@pytest.fixture(scope='module')
+def trained():
+    series = pd.Series(100 + np.cumsum(np.random.default_rng(0).normal(size=300)))
+    detector = RegimeDetector(lookback_window=20, hidden_units=32, epochs=1, batch_size=32)
+    detector.train(series)
+    return detector, series
+
+def test_prepare_data_windows():
+    detector = RegimeDetector(lookback_window=3)
+    X, y = detector.prepare_data(pd.Series(np.arange(10.0)))
+    scaled = np.arange(10.0) / 9
+    assert X.shape == (7, 3, 1) and y.shape == (7,)
+    np.testing.assert_allclose(X[2, :, 0], scaled[2:5])
+    np.testing.assert_allclose(y, scaled[3:])
+
+def test_train_quantize_predict(trained):
+    detector, series = trained
+    expected = detector.predict(series)
+    assert expected.shape == (len(series) - 20, 1)
+    detector.quantize()
+    # Not a multiple of batch_size, so the last chunk is padded
+    quantized = detector.predict(series)
+    assert quantized.shape == expected.shape
+    assert np.isfinite(quantized).all()
+    # int8 weights only perturb the float predictions slightly, in price units
+    assert np.abs(quantized - expected).max() < 0.05 * (series.max() - series.min())
+    # Retraining drops the interpreter again
+    detector.train(series)
+    assert detector._interpreter is None
@@ -0,0 +1,66 @@
+# tests/test_risk_engine.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.risk_engine import RiskEngine
+
+def _baseline_drawdown_metrics(equity_curve: pd.Series) -> dict:
+    """The original cummax-based drawdown formulas."""
+    running_max = equity_curve.cummax()
+    drawdowns = (equity_curve - running_max) / running_max
+    is_drawdown = drawdowns < 0
+    recovery_times = []
+    current_drawdown_start = None
+    for date, change in is_drawdown.astype(int).diff().items():
+        if change == 1:
+            current_drawdown_start = date
+        elif change == -1 and current_drawdown_start is not None:
+            recovery_times.append((date - current_drawdown_start).days)
+            current_drawdown_start = None
+    return {
+        'max_drawdown': drawdowns.min(),
+        'average_drawdown': drawdowns[drawdowns < 0].mean() if is_drawdown.any() else 0.0,
+        'average_recovery_time': np.mean(recovery_times) if recovery_times else 0.0,
+        'drawdown_frequency': len(recovery_times) / len(equity_curve)
+    }
+
+@pytest.mark.parametrize('n, freq, unit', [(5, 'D', 'ns'), (2000, 'h', 's'), (3000, 'D', 'us')])
+def test_drawdown_metrics_match_baseline(n, freq, unit):
+    rng = np.random.default_rng(n)
+    index = pd.date_range('2000-01-01', periods=n, freq=freq).astype(f'datetime64[{unit}]')
+    equity = pd.Series(1e6 * np.cumprod(1 + rng.normal(0, 0.01, n)), index=index)
+    ours = RiskEngine(pd.DataFrame({'cumulative_strategy': equity})).calculate_drawdown_metrics()
+    expected = _baseline_drawdown_metrics(equity)
+    for metric, value in expected.items():
+        assert ours[metric] == pytest.approx(value, rel=1e-12), metric
+
+def test_drawdown_metrics_short_series():
+    data = pd.DataFrame({'cumulative_strategy': [1e5]}, index=pd.date_range('2020-01-01', periods=1))
+    assert RiskEngine(data).calculate_drawdown_metrics() == {
+        'max_drawdown': 0.0, 'average_drawdown': 0.0, 'average_recovery_time': 0.0, 'drawdown_frequency': 0.0
+    }
+
+@pytest.mark.parametrize('confidence_level', [0.9, 0.95, 0.99])
+def test_tail_risk_metrics_match_baseline(confidence_level):
+    stats = pytest.importorskip('scipy.stats')
+    rng = np.random.default_rng(0)
+    returns = pd.Series(rng.standard_t(4, 2500) * 0.01)
+    returns.iloc[0] = np.nan
+    ours = RiskEngine(pd.DataFrame({'strategy_returns': returns})).calculate_tail_risk_metrics(confidence_level)
+
+    # The original percentile, normal quantile and expected-shortfall formulas
+    valid = returns.dropna()
+    hist_var = np.percentile(valid, (1 - confidence_level) * 100)
+    param_var = stats.norm.ppf(1 - confidence_level, loc=valid.mean(), scale=valid.std())
+    cvar = valid[valid <= hist_var].mean()
+    assert ours['historical_var'] == pytest.approx(hist_var, rel=1e-12)
+    assert ours['parametric_var'] == pytest.approx(param_var, rel=1e-12)
+    assert ours['conditional_var'] == pytest.approx(cvar, rel=1e-12)
+    # The closed-form GPD fit replaced the maximum-likelihood one, so EVT VaR has no exact baseline
+    assert np.isfinite(ours['evt_var'])
+
+def test_tail_risk_metrics_constant_returns():
+    data = pd.DataFrame({'strategy_returns': np.zeros(100)})
+    metrics = RiskEngine(data).calculate_tail_risk_metrics()
+    assert all(value == 0.0 for value in metrics.values())
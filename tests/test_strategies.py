@@ -0,0 +1,73 @@
+# tests/test_strategies.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.panel import PricePanel
+from src.strategies.momentum_strategy import MomentumStrategy
+from src.strategies.statistical_arbitrage import StatisticalArbitrageStrategy
+
+def _prices(n: int = 600, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({'close': close}, index=pd.bdate_range('2020-01-01', periods=n))
+
+def test_momentum_matches_pandas_formula():
+    data = _prices()
+    strategy = MomentumStrategy(window=20)
+    signals = strategy.generate_signals(data)
+    # The original formula, which went short during the warm-up window; no position is taken there now
+    rolling_mean = data['close'].rolling(window=20).mean()
+    expected = (data['close'] > rolling_mean).astype(int).replace(0, -1)
+    pd.testing.assert_series_equal(signals.iloc[19:], expected.iloc[19:], check_dtype=False, check_names=False)
+    assert (signals.iloc[:19] == 0).all()
+    # The input frame is no longer mutated, and both signal paths agree
+    assert list(data.columns) == ['close']
+    np.testing.assert_array_equal(strategy.vectorized_signal(data['close'].to_numpy()), signals.to_numpy())
+
+def test_hedge_ratio_matches_per_window_regressions():
+    rng = np.random.default_rng(3)
+    benchmark = pd.Series(50 + np.cumsum(rng.normal(size=300)))
+    price = 10 + 1.8 * benchmark + pd.Series(rng.normal(size=300))
+    strategy = StatisticalArbitrageStrategy(lookback_period=60)
+    hedge_ratio, intercept = strategy.calculate_hedge_ratio(price, benchmark)
+    # The original loop: one regression per window, the median slope, and the last window's intercept
+    fits = [np.polyfit(benchmark.iloc[i - 60:i], price.iloc[i - 60:i], 1) for i in range(60, len(price))]
+    assert hedge_ratio == pytest.approx(np.median([slope for slope, _ in fits]), rel=1e-9)
+    assert intercept == pytest.approx(fits[-1][1], rel=1e-9)
+
+def _pair(seed: int, phi: float, n: int = 600) -> pd.DataFrame:
+    """A benchmark random walk and a price tied to it through an AR(1) spread with coefficient phi."""
+    rng = np.random.default_rng(seed)
+    benchmark = 50 + np.cumsum(rng.normal(size=n))
+    spread = np.zeros(n)
+    for t in range(1, n):
+        spread[t] = phi * spread[t - 1] + rng.normal()
+    return pd.DataFrame({'close': 5 + 1.5 * benchmark + spread, 'benchmark_close': benchmark},
+                        index=pd.bdate_range('2020-01-01', periods=n))
+
+def test_batch_signals_match_single_pair_signals():
+    # Two tradable pairs, one that is not cointegrated and one that reverts faster than min_half_life
+    pairs = [_pair(0, 0.95), _pair(1, 0.9), _pair(2, 1.0), _pair(3, 0.3)]
+    strategy = StatisticalArbitrageStrategy(lookback_period=40, entry_zscore=1.5)
+    batch = strategy.batch_generate_signals(np.stack([pair['close'].to_numpy() for pair in pairs]),
+                                            np.stack([pair['benchmark_close'].to_numpy() for pair in pairs]))
+    traded = []
+    for row, pair in zip(batch, pairs):
+        single = StatisticalArbitrageStrategy(lookback_period=40, entry_zscore=1.5).generate_signals(pair)
+        np.testing.assert_array_equal(row, single.to_numpy())
+        traded.append(bool(np.any(row)))
+    assert traded == [True, True, False, False]
+
+def test_batch_signals_through_price_panel():
+    pairs = [_pair(0, 0.95), _pair(2, 1.0)]
+    frames = {}
+    for i, pair in enumerate(pairs):
+        frames[f'P{i}'] = pair[['close']]
+        frames[f'B{i}'] = pair[['benchmark_close']].rename(columns={'benchmark_close': 'close'})
+    panel = PricePanel.from_frames(frames)
+    strategy = StatisticalArbitrageStrategy(lookback_period=40, entry_zscore=1.5)
+    batch = strategy.batch_generate_signals(*panel.pair_matrices([('P0', 'B0'), ('P1', 'B1')]))
+    for i, row in enumerate(batch):
+        single = strategy.generate_signals(panel.pair_frame(f'P{i}', f'B{i}'))
+        np.testing.assert_array_equal(row, single.to_numpy())